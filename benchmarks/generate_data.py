@@ -0,0 +1,114 @@
+"""
+sheet_query_data.csv と同じスキーマ・同じ書式の合成データを生成する。
+- 列名（日本語を含む）と列順は実データと同一
+- "27,403.80" のような桁区切り、"+0.2" のような符号付き、空セルも再現
+- category はカンマ区切りの複数値（語彙は実データから）
+"""
+import argparse
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CSV = os.path.join(ROOT, "sheet_query_data.csv")
+
+COLUMNS = [
+    "ONTENT_TYPE", "POST_ID", "URL", "category", "post_title", "session", "page_view",
+    "click_app_store", "article_ctr", "imp", "click", "search_ctr", "sum_position",
+    "avg_position", "sales", "pv_unit_sales", "app_link_click", "cv", "cvr", "growth_rate",
+    "SEO対策KW", "30日間平均順位", "7日間平均順位", "比較（7日間が良ければ＋）",
+]
+
+# 空セルになる割合（実データのおおよその比率）
+BLANK_RATE = 0.05
+
+def _sample_vocab():
+    """
+    実データから category の語彙・タイトル・SEO対策KW を取り出す。
+    """
+    with open(SAMPLE_CSV, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    categories = sorted({c.strip() for r in rows for c in r["category"].split(",") if c.strip()})
+    titles = [r["post_title"] for r in rows if r["post_title"]]
+    keywords = [r["SEO対策KW"] for r in rows if r["SEO対策KW"]]
+    return categories, titles, keywords
+
+def _fmt(values, spec, blank):
+    return ["" if b else format(v, spec) for v, b in zip(values.tolist(), blank.tolist())]
+
+def generate_chunk(rng, start_id: int, n: int, vocab) -> pd.DataFrame:
+    """
+    n 行分の合成データ（全列文字列）を作る。
+    """
+    categories, titles, keywords = vocab
+
+    def blank():
+        return rng.random(n) < BLANK_RATE
+
+    post_ids = np.arange(start_id, start_id + n)
+    session = rng.lognormal(2.0, 1.5, n)
+    page_view = session * rng.uniform(1.0, 1.5, n)
+    imp = rng.lognormal(5.0, 2.0, n)
+    click = imp * rng.uniform(0, 0.05, n)
+    avg_position = rng.uniform(1, 60, n)
+    sales = np.where(rng.random(n) < 0.7, 0.0, rng.lognormal(4.0, 2.0, n))
+    cv = np.round(np.where(sales > 0, rng.lognormal(0, 1.2, n), 0.0), 1)
+    pos30 = np.round(rng.uniform(1, 50, n), 1)
+    pos7 = np.round(np.clip(pos30 + rng.normal(0, 2, n), 1, None), 1)
+
+    n_cats = rng.integers(0, 5, n)
+    cat_idx = rng.integers(0, len(categories), (n, 4))
+    category = [", ".join(categories[j] for j in cat_idx[i, :k]) for i, k in enumerate(n_cats.tolist())]
+
+    return pd.DataFrame({
+        "ONTENT_TYPE": np.where(rng.random(n) < 0.9, "column", "post"),
+        "POST_ID": post_ids.astype(str),
+        "URL": [f"https://good-apps.jp/media/column/{i}" for i in post_ids.tolist()],
+        "category": category,
+        "post_title": [f"{titles[j]}（{i}）" for j, i in zip(rng.integers(0, len(titles), n).tolist(), post_ids.tolist())],
+        "session": _fmt(session, ",.2f", blank()),
+        "page_view": _fmt(page_view, ",.2f", blank()),
+        "click_app_store": _fmt(session * rng.uniform(0, 0.3, n), ",.2f", blank()),
+        "article_ctr": _fmt(rng.uniform(0, 0.5, n), ".10g", blank()),
+        "imp": _fmt(imp, ",.2f", blank()),
+        "click": _fmt(click, ",.2f", blank()),
+        "search_ctr": _fmt(click / imp, ".10g", blank()),
+        "sum_position": _fmt(imp * avg_position, ",.2f", blank()),
+        "avg_position": _fmt(avg_position, ",.2f", blank()),
+        "sales": _fmt(sales, ",.2f", blank()),
+        "pv_unit_sales": _fmt(sales / page_view, ",.2f", blank()),
+        "app_link_click": _fmt(np.round(session * rng.uniform(0, 1, n), 1), ".10g", blank()),
+        "cv": _fmt(cv, ".10g", blank()),
+        "cvr": _fmt(cv / np.maximum(session, 1), ".10g", blank()),
+        "growth_rate": [""] * n,
+        "SEO対策KW": [keywords[j] for j in rng.integers(0, len(keywords), n).tolist()],
+        "30日間平均順位": _fmt(pos30, ".1f", blank()),
+        "7日間平均順位": _fmt(pos7, ".1f", blank()),
+        "比較（7日間が良ければ＋）": _fmt(pos30 - pos7, "+.1f", blank()),
+    }, columns=COLUMNS)
+
+def generate_csv(path: str, n_rows: int, seed: int = 0, chunk_rows: int = 100000) -> str:
+    """
+    n_rows 行の合成 CSV を path に書き出す（chunk_rows 行ずつ生成するのでメモリは一定）。
+    """
+    rng = np.random.default_rng(seed)
+    vocab = _sample_vocab()
+    written = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        while written < n_rows:
+            n = min(chunk_rows, n_rows - written)
+            chunk = generate_chunk(rng, 100000 + written, n, vocab)
+            chunk.to_csv(f, index=False, header=(written == 0), lineterminator="\n")
+            written += n
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="sheet_query_data.csv と同じ形式の合成データを生成する")
+    parser.add_argument("rows", type=int, help="行数")
+    parser.add_argument("output", help="出力先 CSV")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_csv(args.output, args.rows, args.seed)
+    print(f"{args.rows} rows written to {args.output}")
@@ -0,0 +1,130 @@
+"""
+モジュールの import にかかる時間を、毎回新しい Python プロセスで計測する（python -X importtime）。
+アプリの起動（コールドスタート）でどれだけ読み込みが発生しているかを確認するためのもの。
+
+    python benchmarks/import_time.py                        # 今の src/ を計測
+    python benchmarks/import_time.py --ref HEAD~1           # 指定した git の版の src/ と比較
+
+結果は benchmarks/results/import_time_<日時>.json に保存する。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+DEFAULT_MODULES = ["streamlit_app", "data_fetcher"]
+
+# 表示だけのプロセスでは読み込みたくない、取得用の重い依存
+FETCHER_DEPS = ["gspread", "oauth2client", "httplib2", "google.auth", "requests"]
+
+def measure_once(module: str, src_dir: str) -> dict:
+    """
+    新しいプロセスで module を import し、所要時間と読み込まれたモジュール名を返す。
+    - wall_seconds: プロセス起動から終了まで（インタプリタ自体の起動を含む）
+    - import_seconds: -X importtime が出す module の累積時間
+    """
+    pythonpath = os.pathsep.join(p for p in [src_dir, os.environ.get("PYTHONPATH")] if p)
+    env = dict(os.environ, PYTHONPATH=pythonpath, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=src_dir, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+
+    loaded = set()
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line.split("|")
+        name = parts[2].strip()
+        loaded.add(name)
+        if name == module:
+            cumulative_us = int(parts[1])
+    return {
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "wall_seconds": wall,
+        "import_seconds": cumulative_us / 1e6 if cumulative_us is not None else None,
+        "modules": len(loaded),
+        "fetcher_deps": sorted(d for d in FETCHER_DEPS if d in loaded),
+    }
+
+def measure(module: str, src_dir: str, repeat: int) -> dict:
+    """
+    measure_once を repeat 回行い、時間は中央値を返す（1回目はディスクキャッシュの影響を受けるので捨てる）。
+    """
+    measure_once(module, src_dir)
+    runs = [measure_once(module, src_dir) for _ in range(repeat)]
+    last = runs[-1]
+    if not last["ok"]:
+        return {"module": module, "ok": False, "error": last["error"]}
+    return {
+        "module": module,
+        "ok": True,
+        "wall_seconds": round(statistics.median(r["wall_seconds"] for r in runs), 4),
+        "import_seconds": round(statistics.median(r["import_seconds"] for r in runs), 4),
+        "modules": last["modules"],
+        "fetcher_deps": last["fetcher_deps"],
+    }
+
+def export_src(ref: str) -> str:
+    """
+    git の ref 時点の src/ を一時ディレクトリに展開し、そのパスを返す。
+    """
+    out_dir = tempfile.mkdtemp(prefix="ga_metrics_import_")
+    archive = os.path.join(out_dir, "src.tar")
+    subprocess.run(["git", "archive", "-o", archive, ref, "src"], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(out_dir)
+    return os.path.join(out_dir, "src")
+
+def print_row(label: str, r: dict):
+    if not r["ok"]:
+        print(f"{label:<10} {r['module']:<16} failed: {r['error']}")
+        return
+    print(f"{label:<10} {r['module']:<16} wall {r['wall_seconds']:>7.3f}s  import {r['import_seconds']:>7.3f}s  "
+          f"{r['modules']:>5} modules  fetcher deps: {', '.join(r['fetcher_deps']) or '-'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="import 時間の計測")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="計測するモジュール（src/ 内）")
+    parser.add_argument("--repeat", type=int, default=5, help="試行回数（中央値を採用）")
+    parser.add_argument("--ref", default=None, help="比較対象の git ref（その時点の src/ も同じように計測する）")
+    parser.add_argument("--output", default=None, help="結果 JSON の出力先（既定は benchmarks/results/import_time_<日時>.json）")
+    args = parser.parse_args()
+
+    targets = {"current": os.path.join(ROOT, "src")}
+    if args.ref:
+        targets[args.ref] = export_src(args.ref)
+
+    results = {}
+    for label, src_dir in targets.items():
+        results[label] = [measure(m, src_dir, args.repeat) for m in args.modules]
+        for r in results[label]:
+            print_row(label, r)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, "import_time_" + datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results saved to {output}")
@@ -0,0 +1,132 @@
+"""
+load → transform → score → render の各段を Streamlit の外で計測し、結果を JSON に保存する。
+
+    python benchmarks/run_benchmarks.py                     # 10k / 100k / 1M 行
+    python benchmarks/run_benchmarks.py --sizes 10000 --compare benchmarks/results/前回.json
+
+--compare を指定すると前回の結果と段ごとに比較し、閾値より遅くなった段があれば終了コード1で終わる。
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import read_sheet_csv  # noqa: E402
+from generate_data import generate_csv  # noqa: E402
+from scoring import rank_rewrite_priority, ranking_features, top_k_rewrite_priority  # noqa: E402
+from table_view import page_slice, to_html_table  # noqa: E402
+from transform import prepare_view, read_view, write_view  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# 全件 HTML 生成はこの行数までしか測らない（1M 行だと数分かかるため）
+FULL_RENDER_MAX_ROWS = 100_000
+
+def timed(func, repeat: int):
+    """
+    func を repeat 回実行し、(最短秒数, 最後の戻り値) を返す。
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def bench_size(n_rows: int, data_dir: str, repeat: int, page_size: int = 50) -> dict:
+    csv_path = os.path.join(data_dir, f"synthetic_{n_rows}.csv")
+    if not os.path.exists(csv_path):
+        generate_csv(csv_path, n_rows)
+
+    stages = {}
+    stages["load_data"], df = timed(lambda: read_sheet_csv(csv_path), repeat)
+    stages["transform"], view = timed(lambda: prepare_view(df), repeat)
+    stages["score_full_sort"], ranked = timed(lambda: rank_rewrite_priority(view), repeat)
+    stages["score_features"], features = timed(lambda: ranking_features(view), repeat)
+    stages["score_top_k"], _ = timed(lambda: top_k_rewrite_priority(view, features, {"cv": 0.8}, 50), repeat)
+    stages["render_page"], _ = timed(lambda: to_html_table(page_slice(ranked, 1, page_size)), repeat)
+    if n_rows <= FULL_RENDER_MAX_ROWS:
+        stages["render_full"], _ = timed(lambda: to_html_table(view), 1)
+
+    view_path = os.path.join(data_dir, f"synthetic_{n_rows}_view.parquet")
+    stages["artifact_write"], _ = timed(lambda: write_view(csv_path, view_path), 1)
+    stages["artifact_read"], _ = timed(lambda: read_view(view_path), repeat)
+
+    return {
+        "rows": n_rows,
+        "csv_bytes": os.path.getsize(csv_path),
+        "frame_bytes": int(df.memory_usage(deep=True).sum()),
+        "stages": {k: round(v, 6) for k, v in stages.items()},
+    }
+
+def compare(current: dict, previous: dict, threshold: float) -> list:
+    """
+    行数・段ごとに前回と比較し、threshold 倍を超えて遅くなったものを返す。
+    """
+    prev = {r["rows"]: r["stages"] for r in previous.get("results", [])}
+    regressions = []
+    for r in current["results"]:
+        for stage, sec in r["stages"].items():
+            before = prev.get(r["rows"], {}).get(stage)
+            if not before:
+                continue
+            ratio = sec / before
+            mark = "REGRESSION" if ratio > threshold else ""
+            print(f"{r['rows']:>9} {stage:<16} {before:>10.4f}s -> {sec:>10.4f}s  x{ratio:5.2f} {mark}")
+            if ratio > threshold:
+                regressions.append({"rows": r["rows"], "stage": stage, "before": before, "after": sec})
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ダッシュボード処理のベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="計測する行数")
+    parser.add_argument("--repeat", type=int, default=3, help="各段の試行回数（最短を採用）")
+    parser.add_argument("--data-dir", default=None, help="合成データの置き場所（既定は一時ディレクトリ）")
+    parser.add_argument("--output", default=None, help="結果 JSON の出力先（既定は benchmarks/results/<日時>.json）")
+    parser.add_argument("--compare", default=None, help="比較対象の過去の結果 JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="この倍率を超えて遅くなったら回帰とみなす")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="ga_metrics_bench_")
+    os.makedirs(data_dir, exist_ok=True)
+
+    results = []
+    for n in args.sizes:
+        r = bench_size(n, data_dir, args.repeat)
+        print(json.dumps(r, ensure_ascii=False))
+        results.append(r)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} stage(s) regressed by more than x{args.threshold}")
+            sys.exit(1)
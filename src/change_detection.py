@@ -0,0 +1,108 @@
+import csv
+import hashlib
+from array import array
+
+import numpy as np
+
+def file_fingerprint(path: str) -> str:
+    """
+    ファイル内容の SHA-256（1MB ずつ読むのでファイルサイズに依存せずメモリ一定）。
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _iter_keyed_rows(path: str, key: str):
+    """
+    CSV を1行ずつ読み、(キー, キーの64bitハッシュ, 行の64bitハッシュ) を返す。
+    key 列が無い場合（またはキーが空の行）は行の SHA-1 をキーにする
+    （その場合、内容が変わった行は removed + added として現れる）。
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        headers = next(reader, None)
+        if not headers:
+            return
+        key_idx = headers.index(key) if key in headers else None
+        for row in reader:
+            text = "\x1f".join(row)
+            row_hash = _hash64(text)
+            k = row[key_idx] if key_idx is not None and key_idx < len(row) else ""
+            if k:
+                yield k, _hash64("k\x1f" + k), row_hash
+            else:
+                digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+                yield digest, _hash64("r\x1f" + digest), row_hash
+
+def row_fingerprints(path: str, key: str = "POST_ID") -> tuple:
+    """
+    CSV を1行ずつ読み、(キーのハッシュ, 行のハッシュ) の uint64 配列の組を返す（キーの昇順）。
+    1行あたり16バイトなので、行数が多くてもキー文字列や16進文字列の dict より桁違いに小さい。
+    同じキーの行が複数あれば後の行を使う。
+    """
+    keys = array("Q")
+    rows = array("Q")
+    for _, key_hash, row_hash in _iter_keyed_rows(path, key):
+        keys.append(key_hash)
+        rows.append(row_hash)
+    keys = np.frombuffer(keys, dtype=np.uint64) if keys else np.empty(0, dtype=np.uint64)
+    rows = np.frombuffer(rows, dtype=np.uint64) if rows else np.empty(0, dtype=np.uint64)
+    # 安定ソートなので同じキーの行はファイル順に並ぶ → 各キーの最後の行を残す
+    order = np.argsort(keys, kind="stable")
+    keys, rows = keys[order], rows[order]
+    last = np.r_[keys[1:] != keys[:-1], True] if len(keys) else np.empty(0, dtype=bool)
+    return keys[last], rows[last]
+
+def diff_rows(old: tuple, new: tuple) -> dict:
+    """
+    row_fingerprints の結果同士を比較し、追加・削除・変更されたキーのハッシュ（uint64 配列）を返す。
+    """
+    old_keys, old_rows = old
+    new_keys, new_rows = new
+    # どちらもキーの昇順・重複なしなので、二分探索で対応する位置を引くだけでよい
+    pos, in_old = _lookup(old_keys, new_keys)
+    _, in_new = _lookup(new_keys, old_keys)
+    return {
+        "added": new_keys[~in_old],
+        "removed": old_keys[~in_new],
+        "changed": new_keys[in_old][old_rows[pos[in_old]] != new_rows[in_old]],
+    }
+
+def _lookup(sorted_keys: np.ndarray, keys: np.ndarray) -> tuple:
+    """
+    keys の各要素の sorted_keys 内の位置と、実際に存在するかどうかの bool 配列。
+    """
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return pos, sorted_keys[pos] == keys
+
+def _resolve_keys(path: str, key: str, hashes: dict) -> dict:
+    """
+    ハッシュを元のキーに戻す。CSV をもう1回流し読みし、該当する行のキーをファイル中の順に集める。
+    メモリは差分の件数にしか比例しない。
+    """
+    wanted = {h: name for name, arr in hashes.items() for h in arr.tolist()}
+    found = {name: {} for name in hashes}
+    if wanted:
+        for k, key_hash, _ in _iter_keyed_rows(path, key):
+            name = wanted.get(key_hash)
+            if name is not None:
+                found[name][k] = None
+    return {name: list(keys) for name, keys in found.items()}
+
+def diff_csv(old_path: str, new_path: str, key: str = "POST_ID") -> dict:
+    """
+    2つの CSV を key 単位で比較する。
+    どちらのファイルも行ごとのハッシュ（1行16バイト）だけを持って比較し、
+    差分のあった行のキーだけを2回目の読み込みで取り出す。
+    """
+    diff = diff_rows(row_fingerprints(old_path, key), row_fingerprints(new_path, key))
+    result = _resolve_keys(new_path, key, {"added": diff["added"], "changed": diff["changed"]})
+    result.update(_resolve_keys(old_path, key, {"removed": diff["removed"]}))
+    return {name: result[name] for name in ("added", "removed", "changed")}
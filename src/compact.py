@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from scoring import SCORE_DEFAULTS
+
+# スコア計算の入力列は float64 のまま残す（float32 にすると Rewrite Priority Score が微妙に変わるため）
+KEEP_FLOAT64 = set(SCORE_DEFAULTS)
+
+# ユニーク値の割合がこれ以下の文字列列は categorical にする
+CATEGORICAL_MAX_RATIO = 0.5
+
+# category 列の区切り
+CATEGORY_SEP = ","
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    表示用 DataFrame をメモリの少ない型に変換したコピーを返す（値の意味は変えない）。
+    - ユニーク値が少ない文字列列（ONTENT_TYPE, category など）→ category
+    - 整数列 → int32（欠損があれば Int32）
+    - 指標の float 列 → float32（スコア計算の入力列だけは float64 のまま）
+    """
+    out = {}
+    n = len(df)
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_float_dtype(s):
+            out[col] = s if col in KEEP_FLOAT64 else s.astype("float32")
+        elif pd.api.types.is_integer_dtype(s):
+            fits = s.dropna().between(np.iinfo("int32").min, np.iinfo("int32").max).all()
+            if not fits:
+                out[col] = s
+            elif s.isna().any():
+                out[col] = s.astype("Int32")
+            else:
+                out[col] = s.astype("int32")
+        elif (pd.api.types.is_string_dtype(s) or s.dtype == object) and n:
+            out[col] = s.astype("category") if s.nunique() <= n * CATEGORICAL_MAX_RATIO else s
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+def build_category_index(values: pd.Series) -> dict:
+    """
+    カンマ区切りの category 列を、共有の語彙と記事→カテゴリの対応に分解する。
+    - vocab: カテゴリ名の一覧（ソート済み）
+    - offsets / codes: CSR 形式。行 i のカテゴリは codes[offsets[i]:offsets[i+1]]（vocab の番号）
+    - postings: カテゴリ番号ごとの行位置（昇順の ndarray）
+    同じ文字列は1回だけ分解する（categorical の場合はカテゴリごとに1回）。
+    """
+    cat = values.astype("category") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+    # 1つの値の中で同じカテゴリが重複していても1回として扱う
+    labels = [
+        list(dict.fromkeys(t.strip() for t in str(v).split(CATEGORY_SEP) if t.strip())) if pd.notna(v) else []
+        for v in cat.cat.categories
+    ]
+    vocab = sorted({t for ts in labels for t in ts})
+    vocab_id = {t: i for i, t in enumerate(vocab)}
+    label_lengths = np.array([len(ts) for ts in labels] + [0], dtype=np.int64)
+    label_offsets = np.concatenate([[0], np.cumsum(label_lengths[:-1])])
+    label_codes = np.array([vocab_id[t] for ts in labels for t in ts], dtype=np.int32)
+
+    # 欠損（code = -1）は末尾に足した長さ0のラベルとして扱う
+    row_label = cat.cat.codes.to_numpy().astype(np.int64)
+    row_label[row_label < 0] = len(labels)
+    lengths = label_lengths[row_label]
+    offsets = np.zeros(len(row_label) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    starts = np.append(label_offsets, 0)[row_label]
+    codes = label_codes[np.arange(offsets[-1]) - np.repeat(offsets[:-1] - starts, lengths)]
+
+    rows = np.repeat(np.arange(len(row_label)), lengths)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(vocab) + 1))
+    postings = [rows[order[bounds[i]:bounds[i + 1]]] for i in range(len(vocab))]
+
+    return {"vocab": vocab, "offsets": offsets, "codes": codes, "postings": postings}
+
+def category_mask(index: dict, selected: list, match: str = "any") -> np.ndarray:
+    """
+    選択したカテゴリを持つ行の bool 配列を返す。
+    match="any" はどれか1つ、"all" は全てを持つ行。selected が空なら全行 True。
+    """
+    n_rows = len(index["offsets"]) - 1
+    if not selected:
+        return np.ones(n_rows, dtype=bool)
+    vocab_id = {t: i for i, t in enumerate(index["vocab"])}
+    ids = [vocab_id[t] for t in selected if t in vocab_id]
+
+    if match == "all":
+        if len(ids) < len(selected):
+            return np.zeros(n_rows, dtype=bool)
+        counts = np.zeros(n_rows, dtype=np.int32)
+        for i in ids:
+            counts[index["postings"][i]] += 1
+        return counts == len(ids)
+
+    mask = np.zeros(n_rows, dtype=bool)
+    for i in ids:
+        mask[index["postings"][i]] = True
+    return mask
+
+def category_index_bytes(index: dict) -> int:
+    return int(index["offsets"].nbytes + index["codes"].nbytes + sum(p.nbytes for p in index["postings"]))
+
+def compact_report(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """
+    compact_frame の変換前後のメモリ使用量（バイト）。
+    """
+    return {"before": memory_bytes(before), "after": memory_bytes(after)}
@@ -1,8 +1,48 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 
-def main_fetch_all():
+from change_detection import diff_csv, file_fingerprint
+from data_loader import CSV_PATH, apply_schema, iter_sheet_csv
+from perf import PerfRecorder, append_metrics
+from snapshot_store import SNAPSHOT_DIR, write_snapshot, write_snapshot_chunks
+from transform import VIEW_PATH, read_view_meta, write_view
+
+SPREADSHEET_KEY = '1jnxiqozvo5EQa30Yl-Tk9AH-raMsnpCPGsQ_C2io4Ik'
+SHEET_NAME = 'query_貼付'
+
+# 取得対象の設定ファイル（無ければ上の1シートだけを取得する）
+SOURCES_PATH = "sources.json"
+DEFAULT_SOURCES = [
+    {
+        "name": "good-apps",
+        "spreadsheet_key": SPREADSHEET_KEY,
+        "sheet_name": SHEET_NAME,
+        "output": CSV_PATH,
+        "snapshot_dir": SNAPSHOT_DIR,
+        "view": VIEW_PATH,
+    }
+]
+
+# 取得対象ごとに別のパスでなければならない項目（同じだと並行して書き込んで互いに上書きしてしまう）
+UNIQUE_PATH_KEYS = ("output", "snapshot_dir", "view")
+
+# 429 / 一時的なサーバーエラーはリトライする
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def authorize_client():
+    """
+    サービスアカウントで認証した gspread クライアントを返す（全シートで共有する）。
+    """
     scope = [
         'https://spreadsheets.google.com/feeds',
         'https://www.googleapis.com/auth/drive'
@@ -11,26 +51,264 @@ def main_fetch_all():
         'credentials.json',  # サービスアカウントJSONファイル
         scope
     )
-    client = gspread.authorize(creds)
+    return gspread.authorize(creds)
 
-    SPREADSHEET_KEY = '1jnxiqozvo5EQa30Yl-Tk9AH-raMsnpCPGsQ_C2io4Ik'
-    SHEET_NAME = 'query_貼付'
+def load_sources(path: str = SOURCES_PATH) -> list:
+    """
+    取得対象の一覧を読み込む。各要素は name / spreadsheet_key / sheet_name / output と、
+    任意で snapshot_dir（指定した場合だけスナップショットを保存）と
+    view（指定した場合だけ表示用 Parquet を書き出す）を持つ。
+    output / snapshot_dir / view が他の取得対象と重なっていればエラーにする。
+    ファイルが無ければ DEFAULT_SOURCES を返す。
+    """
+    if not os.path.exists(path):
+        return DEFAULT_SOURCES
+    with open(path, encoding="utf-8") as f:
+        sources = json.load(f)
+    used = {}
+    for src in sources:
+        missing = [k for k in ("name", "spreadsheet_key", "sheet_name", "output") if k not in src]
+        if missing:
+            raise ValueError(f"{path}: source {src.get('name', '?')} is missing {missing}")
+        for key in UNIQUE_PATH_KEYS:
+            if not src.get(key):
+                continue
+            target = os.path.normpath(src[key])
+            if target in used:
+                raise ValueError(f"{path}: source {src['name']} uses the same {key} as {used[target]}: {src[key]}")
+            used[target] = src["name"]
+    return sources
 
-    sh = client.open_by_key(SPREADSHEET_KEY)
-    worksheet = sh.worksheet(SHEET_NAME)
+def source_paths(sources: list) -> list:
+    """
+    取得結果として書き出されるパス（CSV・表示用 Parquet・スナップショットのディレクトリ）の一覧。
+    """
+    return [src[key] for src in sources for key in UNIQUE_PATH_KEYS if src.get(key)]
 
-    data = worksheet.get_all_values()
+def is_retryable(exc: Exception) -> bool:
+    """
+    クォータ超過（429）や一時的なサーバーエラーかどうか。
+    gspread の APIError と同じく exc.response.status_code を見る。
+    """
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) in RETRYABLE_STATUS
+
+def call_with_retry(func, *args, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 32.0, **kwargs):
+    """
+    func を呼び出し、リトライ対象のエラーなら指数バックオフ + ジッター（full jitter）で再試行する。
+    待ち時間は 0〜min(max_delay, base_delay * 2**試行回数) 秒の一様乱数。
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            print(f"Retryable error ({e}); retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+
+def iter_worksheet_chunks(worksheet, chunk_rows: int = 5000):
+    """
+    ワークシートを chunk_rows 行ずつ範囲指定（"1:5000" 形式）で取得し、行のリストを順に返す。
+    gspread の Worksheet と同じく row_count 属性と get(range_name) を持つオブジェクトなら何でもよい。
+    - API は範囲末尾の空行を返さないので、途中の空行は後続にデータがある場合だけ補う
+      （get_all_values と同じく、シート末尾の空行は出力しない）
+    """
+    total = worksheet.row_count
+    pending_blank = 0
+    start = 1
+    while start <= total:
+        end = min(start + chunk_rows - 1, total)
+        rows = list(call_with_retry(worksheet.get, f"{start}:{end}"))
+        if rows:
+            yield [[] for _ in range(pending_blank)] + rows
+            pending_blank = 0
+        pending_blank += (end - start + 1) - len(rows)
+        start = end + 1
+
+def stream_worksheet_to_csv(worksheet, path: str = CSV_PATH, chunk_rows: int = 5000) -> int:
+    """
+    ワークシートをチャンク単位で取得し、届いた分からそのまま CSV に書き出す。
+    メモリに載るのは常に1チャンク分だけ。一時ファイルに書いてから置き換えるので、
+    途中で失敗しても既存の CSV は壊れない。書き出したデータ行数を返す。
+    """
+    tmp_path = path + ".tmp"
+    n_rows = 0
+    headers = None
+    with open(tmp_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        for rows in iter_worksheet_chunks(worksheet, chunk_rows):
+            if headers is None:
+                headers = rows[0]
+                writer.writerow(headers)
+                rows = rows[1:]
+            width = len(headers)
+            # API は行末の空セルを省略するので、ヘッダー幅に揃える
+            writer.writerows(r[:width] + [""] * (width - len(r)) for r in rows)
+            n_rows += len(rows)
+        if headers is None:  # シートが空の場合
+            f.write("\n")
+    os.replace(tmp_path, path)
+    return n_rows
+
+def fetch_all_values(worksheet) -> pd.DataFrame:
+    """
+    シート全体を1回で取得して DataFrame にする（小さいシート向け）。
+    """
+    data = call_with_retry(worksheet.get_all_values)
 
     if not data:  # シートが空の場合
-        df = pd.DataFrame()
+        return pd.DataFrame()
+    headers = data[0]
+    rows = data[1:]
+    return pd.DataFrame(rows, columns=headers)
+
+def fetch_source(client, source: dict, chunk_rows: int = None) -> dict:
+    """
+    1つのシートを取得して source["output"] に CSV を書き出し、
+    snapshot_dir があれば当日分のスナップショット、view があれば表示用 Parquet も書き出す。
+    chunk_rows を指定すると、その行数ずつ取得して逐次書き出すストリーミングモードになる。
+    - 一旦 output + ".new" に取得し、既存の CSV と内容が同じなら何も書き換えずに終わる
+    - 変わっていれば POST_ID 単位の差分（added / removed / changed）を結果に含める
+    - スナップショットは CSV を置き換える前に書く（途中で失敗したら次回も「変更あり」として書き直す）
+    """
+    perf = PerfRecorder(f"fetch:{source['name']}")
+    output = source["output"]
+    snapshot_dir = source.get("snapshot_dir")
+    new_path = output + ".new"
+    with perf.span("open_by_key"):
+        sh = call_with_retry(client.open_by_key, source["spreadsheet_key"])
+    with perf.span("worksheet"):
+        worksheet = call_with_retry(sh.worksheet, source["sheet_name"])
+
+    if chunk_rows:
+        with perf.span("stream_to_csv") as span:
+            n_rows = stream_worksheet_to_csv(worksheet, new_path, chunk_rows)
+            span["rows"] = n_rows
     else:
-        headers = data[0]
-        rows = data[1:]
-        df = pd.DataFrame(rows, columns=headers)
+        with perf.span("get_all_values") as span:
+            df = fetch_all_values(worksheet)
+            span["rows"] = len(df)
+        # CSV 出力
+        with perf.span("write_csv", rows=len(df)):
+            df.to_csv(new_path, index=False, encoding="utf-8-sig")
+        n_rows = len(df)
 
-    # CSV 出力
-    df.to_csv("sheet_query_data.csv", index=False, encoding="utf-8-sig")
-    print("Data has been fetched from Sheets and saved to sheet_query_data.csv!")
+    with perf.span("fingerprint", rows=n_rows):
+        result = {
+            "name": source["name"],
+            "output": output,
+            "rows": n_rows,
+            "fingerprint": file_fingerprint(new_path),
+        }
+        unchanged = os.path.exists(output) and file_fingerprint(output) == result["fingerprint"]
+
+    if unchanged:
+        # 前回と同一 → CSV もスナップショットも触らない
+        os.remove(new_path)
+        result["changed"] = False
+        result["diff"] = {"added": [], "removed": [], "changed": []}
+    else:
+        result["changed"] = True
+        with perf.span("diff", rows=n_rows):
+            result["diff"] = diff_csv(output, new_path) if os.path.exists(output) else None
+        # 履歴用に当日分のスナップショットを追加
+        if n_rows and snapshot_dir:
+            with perf.span("snapshot", rows=n_rows):
+                if chunk_rows:
+                    write_snapshot_chunks(iter_sheet_csv(new_path, chunk_rows), root=snapshot_dir)
+                else:
+                    write_snapshot(apply_schema(df), root=snapshot_dir)
+        os.replace(new_path, output)
+
+    # 表示用 Parquet は、データが変わったとき・まだ今の CSV から作られていないときだけ作り直す
+    view_path = source.get("view")
+    if view_path and n_rows:
+        if result["changed"] or read_view_meta(view_path).get("source_fingerprint") != result["fingerprint"]:
+            with perf.span("view_artifact", rows=n_rows):
+                write_view(output, view_path, source_fingerprint=result["fingerprint"])
+
+    result["perf"] = perf.to_dict()
+    result["seconds"] = round(result["perf"]["total_seconds"], 2)
+    return result
+
+def _describe(result: dict) -> str:
+    if not result["changed"]:
+        return "unchanged, skipped"
+    diff = result["diff"]
+    if diff is None:
+        return f"{result['rows']} rows saved to {result['output']} (new file)"
+    return (f"{result['rows']} rows saved to {result['output']} "
+            f"(+{len(diff['added'])} / -{len(diff['removed'])} / ~{len(diff['changed'])})")
+
+def main_fetch_all(chunk_rows: int = None, sources: list = None, max_workers: int = 4, client=None, metrics_path: str = None) -> list:
+    """
+    全ての取得対象をスレッドプールで並行して取得する。
+    認証済みクライアントは1つだけ作って共有するので、全体の所要時間は一番遅いシートに近くなる。
+    1つでも失敗した場合は、他のシートを書き出した後で RuntimeError を送出する。
+    各段の計測結果は結果の "perf" に入り、metrics_path（または GA_METRICS_PERF_PATH）に追記される。
+    """
+    perf = PerfRecorder("fetch_all")
+    if sources is None:
+        sources = load_sources()
+    if client is None:
+        with perf.span("authorize"):
+            client = authorize_client()
+
+    results = []
+    errors = []
+    with perf.span("fetch_sources", rows=len(sources)), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_source, client, src, chunk_rows): src for src in sources}
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append((src["name"], e))
+                print(f"[{src['name']}] Failed to fetch: {e}")
+                continue
+            results.append(result)
+            print(f"[{result['name']}] {_describe(result)} ({result['seconds']}s)")
+
+    perf.write_json(metrics_path)
+    for result in results:
+        append_metrics(result["perf"], metrics_path)
+
+    if errors:
+        raise RuntimeError(f"Failed to fetch {len(errors)} of {len(sources)} sources: {[n for n, _ in errors]}")
+    if not any(r["changed"] for r in results):
+        print("No changes since the last fetch.")
+    return results
 
 if __name__ == "__main__":
-    main_fetch_all()
+    parser = argparse.ArgumentParser(description="Google Sheets からデータを取得して CSV に保存する")
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help="指定した行数ずつ取得して逐次書き出す（未指定ならシート全体を一括取得）",
+    )
+    parser.add_argument(
+        "--sources",
+        default=SOURCES_PATH,
+        help="取得対象の設定ファイル（JSON）。無ければ既定の1シートだけを取得する",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="同時に取得するシート数")
+    parser.add_argument("--diff-json", default=None, help="取得結果と行単位の差分を書き出す JSON ファイル")
+    parser.add_argument("--metrics-json", default=None, help="各段の計測結果を JSON Lines で追記するファイル")
+    parser.add_argument("--list-outputs", action="store_true", help="取得せず、書き出し先のパスを1行ずつ表示する")
+    args = parser.parse_args()
+    if args.list_outputs:
+        print("\n".join(source_paths(load_sources(args.sources))))
+        raise SystemExit(0)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = main_fetch_all(
+        chunk_rows=args.chunk_rows,
+        sources=load_sources(args.sources),
+        max_workers=args.workers,
+        metrics_path=args.metrics_json,
+    )
+    if args.diff_json:
+        with open(args.diff_json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,80 @@
+import pandas as pd
+
+CSV_PATH = "sheet_query_data.csv"
+
+# sheet_query_data.csv の列定義（"str" / "int" / "float"）
+# シートからは全て文字列で届く（"27,403.80" や "+0.2" など）ので、ここで型を確定させる。
+# POST_ID は数値でない値（"app" / "www" など）もあるので文字列のまま扱う。
+SCHEMA = {
+    "ONTENT_TYPE": "str",
+    "POST_ID": "str",
+    "URL": "str",
+    "category": "str",
+    "post_title": "str",
+    "session": "float",
+    "page_view": "float",
+    "click_app_store": "float",
+    "article_ctr": "float",
+    "imp": "float",
+    "click": "float",
+    "search_ctr": "float",
+    "sum_position": "float",
+    "avg_position": "float",
+    "sales": "float",
+    "pv_unit_sales": "float",
+    "app_link_click": "float",
+    "cv": "float",
+    "cvr": "float",
+    "growth_rate": "float",
+    "SEO対策KW": "str",
+    "30日間平均順位": "float",
+    "7日間平均順位": "float",
+    "比較（7日間が良ければ＋）": "float",
+}
+
+def parse_numeric(values: pd.Series) -> pd.Series:
+    """
+    文字列の列を float64 に変換する。
+    - 桁区切りのカンマ（"27,403.80"）を除去
+    - 符号付き（"+0.2" / "-0.3"）はそのまま数値化
+    - 空文字や数値化できない値は NaN
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64")
+    cleaned = values.astype(str).str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    文字列のまま読み込んだ DataFrame に SCHEMA の型を当てる。
+    SCHEMA に無い列は常に文字列にする（チャンクごとに型を推測すると、最初のチャンクで決まった
+    Parquet のスキーマと後のチャンクの型が食い違うため）。
+    """
+    out = {}
+    for col in df.columns:
+        kind = SCHEMA.get(col, "str")
+        if kind == "int":
+            out[col] = parse_numeric(df[col]).round().astype("Int64")
+        elif kind == "float":
+            out[col] = parse_numeric(df[col])
+        else:
+            out[col] = df[col].fillna("").astype(str)
+    return pd.DataFrame(out, index=df.index)
+
+def read_sheet_csv(path: str = CSV_PATH) -> pd.DataFrame:
+    """
+    CSV を全列文字列として1回だけ読み込み、SCHEMA に沿って型付けした DataFrame を返す。
+    """
+    raw = pd.read_csv(path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    return apply_schema(raw)
+
+def iter_sheet_csv(path: str = CSV_PATH, chunk_rows: int = 5000):
+    """
+    CSV を chunk_rows 行ずつ読み込み、型付けした DataFrame を順に返す（大きいファイル向け）。
+    """
+    reader = pd.read_csv(
+        path, encoding="utf-8-sig", dtype=str, keep_default_na=False, chunksize=chunk_rows
+    )
+    with reader:
+        for chunk in reader:
+            yield apply_schema(chunk)
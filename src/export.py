@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scoring import calc_rewrite_priority
+
+# 選べる形式 → (拡張子, MIME タイプ)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+# 1回に変換・書き込みする行数（Parquet ではこれが1つの row group になる）
+EXPORT_CHUNK_ROWS = 50000
+
+# 表示用データで計算した値をそのまま出す列（raw の同名列では置き換えない）
+DERIVED_COLUMNS = ["growth_rate", "rewrite_priority"]
+
+def iter_export_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS, raw: pd.DataFrame = None):
+    """
+    df を chunk_rows 行ずつに分けて返す（0行でも列名だけのチャンクを1つ返す）。
+    rewrite_priority 列が無ければチャンクごとに計算して付ける（スナップショットと同じく全行が対象、重みは既定値）。
+    raw（丸める前の型付き DataFrame。df と同じ index）を渡すと、DERIVED_COLUMNS 以外の列を
+    raw の値に置き換える（表示用の小数点第1位の丸めを出力に持ち込まない）。
+    """
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if "rewrite_priority" not in chunk.columns:
+            chunk = chunk.assign(rewrite_priority=calc_rewrite_priority(chunk))
+        if raw is not None:
+            cols = [c for c in chunk.columns if c in raw.columns and c not in DERIVED_COLUMNS]
+            values = raw.loc[chunk.index, cols]
+            chunk = chunk.assign(**{c: values[c] for c in cols})
+        yield chunk
+
+def write_export_csv(df: pd.DataFrame, path: str, chunk_rows: int = EXPORT_CHUNK_ROWS, raw: pd.DataFrame = None) -> int:
+    """
+    CSV（UTF-8 BOM 付き、Excel でそのまま開ける）をチャンクごとに追記して書き出す。書いた行数を返す。
+    """
+    rows = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for i, chunk in enumerate(iter_export_chunks(df, chunk_rows, raw)):
+            chunk.to_csv(f, index=False, header=(i == 0), lineterminator="\n")
+            rows += len(chunk)
+    return rows
+
+def write_export_parquet(df: pd.DataFrame, path: str, chunk_rows: int = EXPORT_CHUNK_ROWS, raw: pd.DataFrame = None) -> int:
+    """
+    Parquet(zstd) をチャンクごとに row group として書き出す。型は DataFrame のまま保つ。書いた行数を返す。
+    """
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_export_chunks(df, chunk_rows, raw):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def export_frame(df: pd.DataFrame, fmt: str, directory: str = None, chunk_rows: int = EXPORT_CHUNK_ROWS,
+                 raw: pd.DataFrame = None) -> str:
+    """
+    df を fmt（"CSV" / "Parquet"）で一時ファイルに書き出し、そのパスを返す。
+    ファイル全体をメモリに組み立てないよう、チャンクごとに書き込む。不要になったら呼び出し側で削除する。
+    raw を渡すと、数値は丸める前の値で出力する（iter_export_chunks を参照）。
+    """
+    suffix, _ = EXPORT_FORMATS[fmt]
+    fd, path = tempfile.mkstemp(prefix="ga_metrics_export_", suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        if fmt == "CSV":
+            write_export_csv(df, path, chunk_rows, raw)
+        else:
+            write_export_parquet(df, path, chunk_rows, raw)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
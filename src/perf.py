@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger("ga_metrics.perf")
+
+# 指定すると計測結果を JSON Lines で追記するファイル
+METRICS_PATH_ENV = "GA_METRICS_PERF_PATH"
+
+# 計測ログのレベル（既定は INFO。WARNING などにすると span のログを出さない）
+LOG_LEVEL_ENV = "GA_METRICS_PERF_LOG_LEVEL"
+
+def configure_logging(level: str = None):
+    """
+    計測ログ（ga_metrics.perf）を標準エラーに出す。
+    logging.basicConfig を呼ばないプロセス（Streamlit アプリ）用。ハンドラが既にあれば何もしない。
+    level も環境変数 GA_METRICS_PERF_LOG_LEVEL も無ければ INFO。
+    """
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel((level or os.environ.get(LOG_LEVEL_ENV) or "INFO").upper())
+    # root にもハンドラがある環境で二重に出さない
+    logger.propagate = False
+
+def rss_bytes() -> int:
+    """
+    現在の常駐メモリ（RSS）のバイト数。Linux 以外では ru_maxrss（ピーク値）で代用する。
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+class PerfRecorder:
+    """
+    名前付きの区間（span）ごとに所要時間・行数・メモリ増減を記録する。
+    1回の処理（アプリの再実行1回、シート1つの取得など）につき1つ作る。
+
+        perf = PerfRecorder("show_sheet1")
+        with perf.span("load") as s:
+            df = load()
+            s["rows"] = len(df)
+    """
+
+    def __init__(self, run: str):
+        self.run = run
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.spans = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, rows: int = None):
+        record = {"name": name, "rows": rows}
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - started, 6)
+            record["rss_delta_bytes"] = rss_bytes() - rss_before
+            self.spans.append(record)
+            logger.info(json.dumps({"run": self.run, **record}, ensure_ascii=False))
+
+    def to_dict(self) -> dict:
+        return {
+            "run": self.run,
+            "started_at": self.started_at,
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "spans": list(self.spans),
+        }
+
+    def write_json(self, path: str = None):
+        append_metrics(self.to_dict(), path)
+
+def append_metrics(record: dict, path: str = None):
+    """
+    計測結果（PerfRecorder.to_dict() の形）を JSON Lines で追記する。
+    path も環境変数 GA_METRICS_PERF_PATH も無ければ何もしない。
+    """
+    path = path or os.environ.get(METRICS_PATH_ENV)
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+# Rewrite Priority Score の重み（README の w_sales, w_cv ... に対応）
+DEFAULT_WEIGHTS = {
+    "sales": 1.0,         # 売上
+    "cv": 1.0,            # CV
+    "page_view": 0.5,     # page_view
+    "imp": 0.5,           # imp（インプレッション）
+    "growth_rate": 0.3,   # growth_rate（順位改善度合い）
+    "avg_position": 0.2,  # avg_position（大きいほどマイナス評価）
+}
+
+# 列が存在しない場合のデフォルト値（avg_position だけは 9999 = 圏外扱い）
+SCORE_DEFAULTS = {
+    "sales": 0.0,
+    "cv": 0.0,
+    "page_view": 0.0,
+    "imp": 0.0,
+    "growth_rate": 0.0,
+    "avg_position": 9999.0,
+}
+
+def numeric_column(df: pd.DataFrame, col: str, default: float = 0.0) -> np.ndarray:
+    """
+    列を float64 の ndarray として取り出す。
+    - 数値化できない値・欠損は 0
+    - 列そのものが無い場合は default で埋める
+    """
+    if col not in df.columns:
+        return np.full(len(df), default, dtype="float64")
+    values = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    return values.to_numpy(dtype="float64")
+
+def calc_growth_rate(df: pd.DataFrame) -> pd.Series:
+    """
+    「30日間平均順位」「7日間平均順位」から順位改善率(%)を列単位で計算する。
+    30日間平均順位が 0 以下の行は 0。小数点第1位で丸める。
+    """
+    old_pos = numeric_column(df, "30日間平均順位")
+    new_pos = numeric_column(df, "7日間平均順位")
+
+    rate = np.zeros(len(df), dtype="float64")
+    mask = old_pos > 0
+    rate[mask] = ((old_pos[mask] - new_pos[mask]) / old_pos[mask]) * 100
+    return pd.Series(rate, index=df.index, name="growth_rate").round(1)
+
+def rewrite_targets(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rewrite Priority Score の対象（sales > 0 の行）だけを残す。
+    """
+    if "sales" not in df.columns:
+        return df.iloc[0:0]
+    return df[numeric_column(df, "sales") > 0]
+
+def calc_rewrite_priority(df: pd.DataFrame, weights: dict = None) -> pd.Series:
+    """
+    Rewrite Priority Score を列単位で計算する。
+    score = log(sales+1)*w_sales + cv*w_cv + log(page_view+1)*w_pv
+            + log(imp+1)*w_imp + growth_rate*w_gr - avg_position*w_pos
+    """
+    w = dict(DEFAULT_WEIGHTS)
+    if weights:
+        w.update(weights)
+
+    s   = numeric_column(df, "sales", SCORE_DEFAULTS["sales"])
+    c   = numeric_column(df, "cv", SCORE_DEFAULTS["cv"])
+    pv  = numeric_column(df, "page_view", SCORE_DEFAULTS["page_view"])
+    imp = numeric_column(df, "imp", SCORE_DEFAULTS["imp"])
+    gr  = numeric_column(df, "growth_rate", SCORE_DEFAULTS["growth_rate"])
+    pos = numeric_column(df, "avg_position", SCORE_DEFAULTS["avg_position"])
+
+    score = (np.log(s+1) * w["sales"]
+             + c           * w["cv"]
+             + np.log(pv+1)* w["page_view"]
+             + np.log(imp+1)* w["imp"]
+             + gr          * w["growth_rate"]
+             - pos         * w["avg_position"])
+    return pd.Series(score, index=df.index, name="rewrite_priority")
+
+def _coerce_score_columns(df: pd.DataFrame) -> pd.DataFrame:
+    for cname in ["sales","cv","page_view","imp","growth_rate","avg_position"]:
+        if cname in df.columns:
+            df[cname] = pd.to_numeric(df[cname], errors="coerce").fillna(0)
+    return df
+
+def rank_rewrite_priority(df: pd.DataFrame, weights: dict = None) -> pd.DataFrame:
+    """
+    sales=0 の行を除外し、rewrite_priority 列を付けて降順ソートした DataFrame を返す。
+    同点の行は元の並び順を保つ（安定ソート）。
+    """
+    df = _coerce_score_columns(rewrite_targets(df).copy())
+    df["rewrite_priority"] = calc_rewrite_priority(df, weights)
+    df.sort_values("rewrite_priority", ascending=False, kind="mergesort", inplace=True)
+    return df
+
+def ranking_features(df: pd.DataFrame) -> dict:
+    """
+    重み調整用に、対象行（sales > 0）の特徴量を前計算しておく。
+    対数変換はここで1回だけ行い、重みを変えたときは score_from_features で線形結合するだけにする。
+    - positions: df 内での行位置（iloc 用）
+    - 各特徴量: float64 の ndarray
+    """
+    mask = numeric_column(df, "sales") > 0 if "sales" in df.columns else np.zeros(len(df), dtype=bool)
+    targets = df[mask]
+    return {
+        "positions": np.flatnonzero(mask),
+        "log_sales": np.log(numeric_column(targets, "sales", SCORE_DEFAULTS["sales"]) + 1),
+        "cv": numeric_column(targets, "cv", SCORE_DEFAULTS["cv"]),
+        "log_page_view": np.log(numeric_column(targets, "page_view", SCORE_DEFAULTS["page_view"]) + 1),
+        "log_imp": np.log(numeric_column(targets, "imp", SCORE_DEFAULTS["imp"]) + 1),
+        "growth_rate": numeric_column(targets, "growth_rate", SCORE_DEFAULTS["growth_rate"]),
+        "avg_position": numeric_column(targets, "avg_position", SCORE_DEFAULTS["avg_position"]),
+    }
+
+def score_from_features(features: dict, weights: dict = None) -> np.ndarray:
+    """
+    前計算した特徴量から Rewrite Priority Score を計算する（calc_rewrite_priority と同じ値）。
+    """
+    w = dict(DEFAULT_WEIGHTS)
+    if weights:
+        w.update(weights)
+    return (features["log_sales"] * w["sales"]
+            + features["cv"]            * w["cv"]
+            + features["log_page_view"] * w["page_view"]
+            + features["log_imp"]       * w["imp"]
+            + features["growth_rate"]   * w["growth_rate"]
+            - features["avg_position"]  * w["avg_position"])
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    スコア上位 k 件の位置を降順で返す。全件の安定ソート（同点は元の順）の先頭 k 件と一致する。
+    - argpartition で k 番目の値を求め、それ以上の候補（同点を含む）だけをソートする
+    - NaN は最下位扱い
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    key = np.where(np.isnan(scores), -np.inf, scores)
+    if k < n:
+        threshold = key[np.argpartition(-key, k - 1)[k - 1]]
+        candidates = np.flatnonzero(key >= threshold)
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -key[candidates]))
+    return candidates[order[:k]]
+
+def top_k_rewrite_priority(df: pd.DataFrame, features: dict, weights: dict = None, k: int = 50,
+                           row_mask: np.ndarray = None) -> pd.DataFrame:
+    """
+    ranking_features の結果を使い、rank_rewrite_priority(df, weights).head(k) と同じ DataFrame を返す。
+    並べ替えるのは上位 k 件だけなので、重みを変えるたびの再計算が軽い。
+    row_mask（df の行数分の bool）を渡すと、True の行だけを対象にする
+    （rank_rewrite_priority(df[row_mask], weights).head(k) と同じ）。
+    """
+    scores = score_from_features(features, weights)
+    positions = features["positions"]
+    if row_mask is not None:
+        keep = row_mask[positions]
+        scores = scores[keep]
+        positions = positions[keep]
+    top = top_k_indices(scores, k)
+    out = _coerce_score_columns(df.iloc[positions[top]].copy())
+    out["rewrite_priority"] = scores[top]
+    return out
@@ -0,0 +1,160 @@
+import sys
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# 検索対象の文字列列と、範囲で絞り込める数値列
+TEXT_FIELDS = ["post_title", "SEO対策KW"]
+RANGE_FIELDS = ["sales", "avg_position", "growth_rate"]
+
+def normalize(text: str) -> str:
+    """
+    全角/半角・大文字/小文字の揺れを吸収する（NFKC + casefold）。
+    """
+    return unicodedata.normalize("NFKC", text).casefold()
+
+def _group_postings(keys: np.ndarray, docs: np.ndarray, doc_bits: int) -> dict:
+    """
+    (key, 文書番号) の組を key ごとの文書番号リストにまとめる（重複は除く）。
+    2つを1つの int64 に詰めてソートするので、並べ替えと重複除去が1回で済む。
+    keys はソート済みのユニーク値、offsets / docs は CSR 形式。
+    """
+    pairs = (keys << doc_bits) | docs
+    pairs.sort()
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    keys = pairs >> doc_bits
+    docs = (pairs & ((1 << doc_bits) - 1)).astype(np.int32)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+    return {
+        "keys": keys[starts],
+        "offsets": np.append(starts, len(keys)).astype(np.int64),
+        "docs": docs,
+    }
+
+def build_ngram_index(values: pd.Series) -> dict:
+    """
+    文字列の列から、文字 uni-gram / bi-gram の転置インデックスを作る（形態素解析なしで日本語に対応）。
+    同じ文字列は1つの文書として1回だけ索引し、全文書を1つの UTF-32 配列にして numpy で処理する。
+    - codes: 行 → 文書番号（欠損は末尾の空文書）
+    - texts: 正規化済みの文書（候補の最終確認用）
+    - chars: 出現する文字のコードポイント（ソート済み）。n-gram の key はこの番号で作る
+    - unigram / bigram: {"keys", "offsets", "docs"}
+    """
+    codes, uniques = pd.factorize(values)
+    texts = [normalize(str(v)).replace("\0", "") for v in uniques] + [""]
+    codes = np.where(codes < 0, len(texts) - 1, codes).astype(np.int32)
+    texts = np.array(texts, dtype=object)
+
+    # 区切りに \0 を入れて連結し、各文字がどの文書かを求める
+    cps = np.frombuffer("\0".join(texts.tolist()).encode("utf-32-le"), dtype=np.uint32)
+    sep = cps == 0
+    doc = np.cumsum(sep)
+    present = np.bincount(cps, minlength=1) > 0
+    chars = np.flatnonzero(present).astype(np.uint32)
+    char_id = (np.cumsum(present) - 1)[cps]
+    char_bits = max(1, len(chars).bit_length())
+    doc_bits = max(1, len(texts).bit_length())
+
+    uni_ok = ~sep
+    unigram = _group_postings(char_id[uni_ok], doc[uni_ok], doc_bits)
+    bi_ok = uni_ok[:-1] & uni_ok[1:]
+    bi_keys = (char_id[:-1] << char_bits) | char_id[1:]
+    bigram = _group_postings(bi_keys[bi_ok], doc[:-1][bi_ok], doc_bits)
+
+    return {
+        "codes": codes,
+        "texts": texts,
+        "chars": chars,
+        "char_bits": char_bits,
+        "unigram": unigram,
+        "bigram": bigram,
+    }
+
+def _posting(table: dict, key: int) -> np.ndarray:
+    i = np.searchsorted(table["keys"], key)
+    if i >= len(table["keys"]) or table["keys"][i] != key:
+        return np.empty(0, dtype=np.int32)
+    return table["docs"][table["offsets"][i]:table["offsets"][i + 1]]
+
+def ngram_search(index: dict, query: str) -> np.ndarray:
+    """
+    query を部分一致で含む文書の番号（昇順）を返す。
+    1文字なら uni-gram、2文字以上なら bi-gram の積集合で候補を絞り、3文字以上は実際に含むか確認する。
+    """
+    q = normalize(query).strip()
+    if not q:
+        return np.arange(len(index["texts"]))
+    cps = np.array([ord(c) for c in q], dtype=np.uint32)
+    pos = np.searchsorted(index["chars"], cps)
+    if (pos >= len(index["chars"])).any() or (index["chars"][np.minimum(pos, len(index["chars"]) - 1)] != cps).any():
+        return np.empty(0, dtype=np.int32)
+    ids = pos.astype(np.int64).tolist()
+    if len(ids) == 1:
+        return _posting(index["unigram"], ids[0])
+
+    keys = sorted({(a << index["char_bits"]) | b for a, b in zip(ids[:-1], ids[1:])})
+    postings = sorted((_posting(index["bigram"], k) for k in keys), key=len)
+    candidates = postings[0]
+    for p in postings[1:]:
+        if not len(candidates):
+            break
+        candidates = np.intersect1d(candidates, p, assume_unique=True)
+    if len(ids) == 2 or not len(candidates):
+        return candidates
+    texts = index["texts"][candidates]
+    return candidates[np.fromiter((q in t for t in texts), dtype=bool, count=len(texts))]
+
+def build_search_index(df: pd.DataFrame, text_fields: list = None, range_fields: list = None) -> dict:
+    """
+    データセットごとに1回だけ作る検索用インデックス。
+    - text: 列ごとの n-gram インデックス
+    - ranges: 範囲絞り込み用の float64 配列
+    - bounds: 範囲絞り込み列の (最小, 最大)。全て欠損の列は含めない
+    - bytes: インデックス全体のおおよそのメモリ使用量
+    """
+    text_fields = TEXT_FIELDS if text_fields is None else text_fields
+    range_fields = RANGE_FIELDS if range_fields is None else range_fields
+    text = {c: build_ngram_index(df[c]) for c in text_fields if c in df.columns}
+    ranges = {
+        c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64")
+        for c in range_fields if c in df.columns
+    }
+    bounds = {
+        c: (float(np.nanmin(v)), float(np.nanmax(v)))
+        for c, v in ranges.items() if not np.isnan(v).all()
+    }
+    n_bytes = sum(v.nbytes for v in ranges.values())
+    for idx in text.values():
+        n_bytes += idx["codes"].nbytes + idx["chars"].nbytes + sum(sys.getsizeof(t) for t in idx["texts"])
+        for table in (idx["unigram"], idx["bigram"]):
+            n_bytes += table["keys"].nbytes + table["offsets"].nbytes + table["docs"].nbytes
+    return {"n_rows": len(df), "text": text, "ranges": ranges, "bounds": bounds, "bytes": int(n_bytes)}
+
+def text_mask(index: dict, query: str, fields: list = None) -> np.ndarray:
+    """
+    query を空白で区切った全ての語を含む行（語ごとに、指定列のどれかに含まれればよい）の bool 配列。
+    """
+    mask = np.ones(index["n_rows"], dtype=bool)
+    fields = [f for f in (fields or index["text"]) if f in index["text"]]
+    for term in normalize(query).split():
+        hit = np.zeros(index["n_rows"], dtype=bool)
+        for f in fields:
+            field = index["text"][f]
+            docs = np.zeros(len(field["texts"]), dtype=bool)
+            docs[ngram_search(field, term)] = True
+            hit |= docs[field["codes"]]
+        mask &= hit
+    return mask
+
+def range_mask(index: dict, field: str, low: float = None, high: float = None) -> np.ndarray:
+    """
+    low <= 値 <= high の行の bool 配列（欠損は False）。low / high が None ならその側は無制限。
+    """
+    values = index["ranges"][field]
+    mask = ~np.isnan(values)
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
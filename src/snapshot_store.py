@@ -0,0 +1,137 @@
+import os
+import shutil
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scoring import calc_rewrite_priority
+from transform import prepare_view
+
+SNAPSHOT_DIR = "snapshots"
+
+# snapshots/date=YYYY-MM-DD/part-0.parquet の hive 形式で日付ごとに分割して保存する
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+def _partition_dir(snapshot_date: date, root: str) -> str:
+    return os.path.join(root, f"date={snapshot_date.isoformat()}")
+
+def _with_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    growth_rate / rewrite_priority を付ける。アプリの表と同じ値になるよう、prepare_view（丸め・欠損の 0 埋め）
+    を通した値から計算する。その他の列は丸める前の値のまま保存する。
+    """
+    prepared = prepare_view(df)
+    df = df.copy()
+    if "growth_rate" in prepared.columns:
+        df["growth_rate"] = prepared["growth_rate"]
+    df["rewrite_priority"] = calc_rewrite_priority(prepared)
+    return df
+
+def write_snapshot(df: pd.DataFrame, snapshot_date: date = None, root: str = SNAPSHOT_DIR) -> str:
+    """
+    型付け済みの DataFrame を1日分のパーティションとして Parquet(zstd) で保存する。
+    growth_rate / rewrite_priority もこの時点で計算して一緒に保存する。
+    同じ日付のパーティションが既にあれば置き換える。保存先のパスを返す。
+    """
+    return write_snapshot_chunks([df], snapshot_date, root)
+
+def write_snapshot_chunks(chunks, snapshot_date: date = None, root: str = SNAPSHOT_DIR) -> str:
+    """
+    write_snapshot のチャンク版。型付け済み DataFrame のイテラブルを受け取り、
+    1チャンクずつ同じ Parquet ファイルの row group として追記する（メモリは1チャンク分）。
+    """
+    snapshot_date = snapshot_date or date.today()
+    part_dir = _partition_dir(snapshot_date, root)
+    if os.path.isdir(part_dir):
+        shutil.rmtree(part_dir)
+    os.makedirs(part_dir)
+
+    path = os.path.join(part_dir, "part-0.parquet")
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(_with_scores(chunk), preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            else:
+                table = pa.Table.from_pandas(_with_scores(chunk), schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+def list_snapshot_dates(root: str = SNAPSHOT_DIR) -> list:
+    """
+    保存済みスナップショットの日付一覧（昇順）。ディレクトリ名だけを見るのでファイルは読まない。
+    """
+    if not os.path.isdir(root):
+        return []
+    dates = []
+    for name in os.listdir(root):
+        if name.startswith("date="):
+            try:
+                dates.append(date.fromisoformat(name[len("date="):]))
+            except ValueError:
+                continue
+    return sorted(dates)
+
+def snapshot_signature(root: str = SNAPSHOT_DIR) -> tuple:
+    """
+    保存済みパーティションの (日付ディレクトリ名, ファイル名, mtime_ns, サイズ) の一覧。
+    ファイルは開かないので軽く、キャッシュのキーに使う（書き直されれば値が変わる）。
+    """
+    if not os.path.isdir(root):
+        return ()
+    sig = []
+    for name in sorted(os.listdir(root)):
+        part = os.path.join(root, name)
+        if not name.startswith("date=") or not os.path.isdir(part):
+            continue
+        for entry in sorted(os.scandir(part), key=lambda e: e.name):
+            st = entry.stat()
+            sig.append((name, entry.name, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+def load_snapshots(
+    start: date = None,
+    end: date = None,
+    columns: list = None,
+    post_ids: list = None,
+    root: str = SNAPSHOT_DIR,
+) -> pd.DataFrame:
+    """
+    start〜end（両端含む）のパーティションから、指定列だけを読み込む。
+    - 日付はパーティション名で絞り込むため、範囲外のファイルは開かない
+    - columns を指定すると Parquet の該当列だけを読む（date 列は常に付く）
+    - post_ids を指定すると POST_ID（文字列）で行を絞り込む
+    """
+    if not list_snapshot_dates(root):
+        return pd.DataFrame()
+
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+    cond = None
+    if start is not None:
+        cond = ds.field("date") >= start.isoformat()
+    if end is not None:
+        c = ds.field("date") <= end.isoformat()
+        cond = c if cond is None else cond & c
+    if post_ids:
+        c = ds.field("POST_ID").isin([str(p) for p in post_ids])
+        cond = c if cond is None else cond & c
+
+    if columns is not None:
+        available = set(dataset.schema.names)
+        columns = ["date"] + [c for c in columns if c in available and c != "date"]
+
+    table = dataset.to_table(columns=columns, filter=cond)
+    df = table.to_pandas()
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+        df.sort_values("date", kind="mergesort", inplace=True)
+        df.reset_index(drop=True, inplace=True)
+    return df
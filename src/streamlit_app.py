@@ -1,20 +1,184 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import html
-from data_fetcher import main_fetch_all
+import os
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta
+from change_detection import file_fingerprint
+from compact import build_category_index, category_index_bytes, category_mask, compact_frame, compact_report
+from data_loader import CSV_PATH, read_sheet_csv
+from export import EXPORT_FORMATS, export_frame
+from perf import PerfRecorder, configure_logging
+from snapshot_store import list_snapshot_dates, load_snapshots, snapshot_signature
+from search_index import build_search_index, range_mask, text_mask
+from scoring import DEFAULT_WEIGHTS, rank_rewrite_priority, ranking_features, top_k_rewrite_priority
+from table_view import PAGE_SIZE_OPTIONS, page_count, page_slice, sort_frame, to_html_table
+from transform import VIEW_PATH, prepare_view, read_view, read_view_meta, view_totals
+
+# 重み調整モードで選べる K
+TOP_K_OPTIONS = [20, 50, 100, 200, 500]
+
+# Performance パネルに残す再実行の回数
+PERF_HISTORY_SIZE = 20
+
+# これがある環境でだけ「今すぐ更新」を表示する（data_fetcher.authorize_client が読むファイル）
+CREDENTIALS_PATH = "credentials.json"
 
 # ページ全体を横幅を広めに使う設定
 st.set_page_config(layout="wide")
 
-def load_data() -> pd.DataFrame:
+# 各段の計測結果（span）をログに出す（Streamlit では basicConfig されないため）
+configure_logging()
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _csv_fingerprint_cached(path: str, mtime_ns: int, size: int) -> str:
+    return file_fingerprint(path)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_view_cached(kind: str, path: str, mtime_ns: int, size: int):
+    """
+    表示用データを読み込み、compact_frame で省メモリ化してからセッション・再実行をまたいでキャッシュする。
+    kind="view" は取得時に書き出した Parquet、"csv" は CSV を prepare_view で変換する。
+    mtime_ns / size はキャッシュキー専用（ファイルが更新されれば自動で読み直す）。
     """
-    sheet_query_data.csv を読み込み、失敗したら空DataFrameを返す。
+    if kind == "view":
+        view, meta = read_view(path)
+    else:
+        view = prepare_view(read_sheet_csv(path))
+        meta = {"totals": view_totals(view)}
+    compact = compact_frame(view)
+    meta["memory"] = compact_report(view, compact)
+    return compact, meta
+
+def load_view():
     """
+    表示用データを (DataFrame, メタデータ) で返す。
+    取得時に書き出した sheet_query_view.parquet が今の CSV から作られたものならそれを読み、
+    無い・古い場合は CSV を prepare_view で変換する。どちらも無ければ空DataFrame。
+    メタデータの csv_key は元の CSV の (パス, mtime_ns, サイズ)（エクスポートで丸める前の値を読むときに使う）。
+    """
+    try:
+        stat = os.stat(CSV_PATH)
+    except OSError:
+        return pd.DataFrame(), {}
+    try:
+        if os.path.exists(VIEW_PATH):
+            vstat = os.stat(VIEW_PATH)
+            if read_view_meta(VIEW_PATH).get("source_fingerprint") == _csv_fingerprint_cached(CSV_PATH, stat.st_mtime_ns, stat.st_size):
+                view, meta = _load_view_cached("view", VIEW_PATH, vstat.st_mtime_ns, vstat.st_size)
+                meta["dataset_key"] = (VIEW_PATH, vstat.st_mtime_ns, vstat.st_size)
+                meta["csv_key"] = (CSV_PATH, stat.st_mtime_ns, stat.st_size)
+                return view, meta
+    except Exception:
+        pass
     try:
-        return pd.read_csv("sheet_query_data.csv", encoding="utf-8-sig")
-    except:
-        return pd.DataFrame()
+        view, meta = _load_view_cached("csv", CSV_PATH, stat.st_mtime_ns, stat.st_size)
+    except Exception:
+        return pd.DataFrame(), {}
+    meta["dataset_key"] = (CSV_PATH, stat.st_mtime_ns, stat.st_size)
+    meta["csv_key"] = meta["dataset_key"]
+    return view, meta
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _ranking_features_cached(dataset_key: tuple, _df: pd.DataFrame) -> dict:
+    """
+    重み調整用の特徴量をデータセットごとに1回だけ計算し、全セッションで共有する。
+    """
+    return ranking_features(_df)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _category_index_cached(dataset_key: tuple, _values: pd.Series) -> dict:
+    """
+    category 列の語彙と記事→カテゴリの対応をデータセットごとに1回だけ作る。
+    """
+    return build_category_index(_values)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _search_index_cached(dataset_key: tuple, _df: pd.DataFrame) -> dict:
+    """
+    キーワード検索（post_title・SEO対策KW）と数値範囲の索引をデータセットごとに1回だけ作る。
+    """
+    return build_search_index(_df)
+
+@st.cache_resource(show_spinner=False)
+def _refresh_state() -> dict:
+    """
+    「今すぐ更新」の実行状態。全セッションで共有し、同時に走る取得は1つだけにする。
+    """
+    return {"lock": threading.Lock(), "running": False, "started_at": None, "finished_at": None, "message": ""}
+
+def _run_refresh(state: dict):
+    """
+    バックグラウンドのスレッドで取得を実行する。
+    gspread / oauth2client はここで初めて import するので、表示だけのときは読み込まれない。
+    """
+    try:
+        from data_fetcher import main_fetch_all
+        results = main_fetch_all()
+        changed = [r["name"] for r in results if r["changed"]]
+        message = f"更新あり: {', '.join(changed)}" if changed else "前回の取得から変更はありませんでした。"
+    except Exception as e:
+        message = f"取得に失敗しました: {e}"
+    with state["lock"]:
+        state.update(running=False, finished_at=datetime.now(), message=message)
+
+def show_refresh_panel():
+    """
+    スプレッドシートから今すぐ取り直すボタン（credentials.json がある環境だけ）。
+    取得は別スレッドで走り、画面はその間も操作できる。終わった後の再実行で新しいデータが読み込まれる。
+    """
+    if not os.path.exists(CREDENTIALS_PATH):
+        return
+    state = _refresh_state()
+    with st.expander("データを今すぐ更新"):
+        with state["lock"]:
+            running = state["running"]
+        if st.button("今すぐ取得", disabled=running):
+            with state["lock"]:
+                if not state["running"]:
+                    state.update(running=True, started_at=datetime.now(), finished_at=None, message="")
+                    threading.Thread(target=_run_refresh, args=(state,), daemon=True).start()
+                running = True
+        if running:
+            st.info(f"取得中です（{state['started_at']:%H:%M:%S} 開始）。終わったらページを再読み込みしてください。")
+        elif state["finished_at"]:
+            st.caption(f"{state['finished_at']:%H:%M:%S} 完了: {state['message']}")
+
+def show_perf_panel(perf: PerfRecorder, memory: dict = None):
+    """
+    今回の再実行の計測結果を履歴に追加し、直近 PERF_HISTORY_SIZE 回分の段ごとの内訳を
+    折りたたみの「Performance」パネルに表示する。memory があれば表示用データのメモリ使用量も出す。
+    """
+    record = perf.to_dict()
+    perf.write_json()
+    history = st.session_state.setdefault("perf_history", deque(maxlen=PERF_HISTORY_SIZE))
+    history.append(record)
+
+    with st.expander("Performance", expanded=False):
+        if memory and "before" in memory:
+            mb = 1024 * 1024
+            text = f"表示用データのメモリ: {memory['before'] / mb:.1f} MB → {memory['after'] / mb:.1f} MB"
+            if "category_index" in memory:
+                text += f"（カテゴリ索引 {memory['category_index'] / mb:.2f} MB）"
+            if "search_index" in memory:
+                text += f"（検索索引 {memory['search_index'] / mb:.2f} MB）"
+            st.caption(text)
+        rows = []
+        for i, rec in enumerate(history):
+            for span in rec["spans"]:
+                rows.append({
+                    "rerun": i + 1,
+                    "started_at": rec["started_at"],
+                    "stage": span["name"],
+                    "ms": round(span["seconds"] * 1000, 2),
+                    "rows": span["rows"],
+                    "rss_delta_MB": round(span["rss_delta_bytes"] / 1024 / 1024, 2),
+                })
+        table = pd.DataFrame(rows)
+        st.write("直近の再実行（ms）")
+        st.dataframe(table.pivot_table(index="rerun", columns="stage", values="ms", sort=False))
+        st.write("今回の再実行")
+        st.dataframe(table[table["rerun"] == len(history)].drop(columns=["rerun"]))
 
 def show_sheet1():
     """
@@ -24,201 +188,327 @@ def show_sheet1():
     - 新規4項目を post_title の直後に挿入
     - growth_rate を「30日間平均順位」「7日間平均順位」から計算
     - Rewrite Priority Score ボタンで sales=0 を除外し、降順ソート
+    - カテゴリ・キーワード・数値範囲で絞り込み
+    - 各段の所要時間を計測し、折りたたみの Performance パネルに表示
+    - credentials.json があれば「今すぐ更新」でバックグラウンド取得
+    - 絞り込み・並び替え後の全件を CSV / Parquet でエクスポート
     """
+    perf = PerfRecorder("show_sheet1")
 
     # -------------------------------
     # 1) CSSや前準備部分（テーブルのカスタムCSS）
     # -------------------------------
-    st.markdown(
-        """
-        <style>
-        /* テーブル全体のデザイン */
-        table.customtable {
-            border-collapse: separate;
-            border-spacing: 0;
-            border: 1px solid #ddd;
-            border-radius: 8px;
-            overflow: hidden;
-            width: 100%;
-        }
-        /* 角丸設定 */
-        table.customtable thead tr:first-child th:first-child {
-            border-top-left-radius: 8px;
-        }
-        table.customtable thead tr:first-child th:last-child {
-            border-top-right-radius: 8px;
-        }
-        table.customtable tbody tr:last-child td:first-child {
-            border-bottom-left-radius: 8px;
-        }
-        table.customtable tbody tr:last-child td:last-child {
-            border-bottom-right-radius: 8px;
-        }
-        /* ヘッダー部分のセルも nowrap + 横スクロール可能に */
-        table.customtable thead th .header-content {
-            display: inline-block;
-            max-width: 120px; 
-            white-space: nowrap;
-            overflow-x: auto;
-        }
-        /* 本文セルの中身を横スクロール許可 */
-        table.customtable td .cell-content {
-            display: inline-block;
-            max-width: 150px;
-            white-space: nowrap;
-            overflow-x: auto;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-    st.markdown("""
-    **項目定義**:  
-    直近7日間の各種指標をBigQueryで集計。
-    """)
+    with perf.span("1_css"):
+        st.markdown(
+            """
+            <style>
+            /* テーブル全体のデザイン */
+            table.customtable {
+                border-collapse: separate;
+                border-spacing: 0;
+                border: 1px solid #ddd;
+                border-radius: 8px;
+                overflow: hidden;
+                width: 100%;
+            }
+            /* 角丸設定 */
+            table.customtable thead tr:first-child th:first-child {
+                border-top-left-radius: 8px;
+            }
+            table.customtable thead tr:first-child th:last-child {
+                border-top-right-radius: 8px;
+            }
+            table.customtable tbody tr:last-child td:first-child {
+                border-bottom-left-radius: 8px;
+            }
+            table.customtable tbody tr:last-child td:last-child {
+                border-bottom-right-radius: 8px;
+            }
+            /* ヘッダー部分のセルも nowrap + 横スクロール可能に */
+            table.customtable thead th .header-content {
+                display: inline-block;
+                max-width: 120px; 
+                white-space: nowrap;
+                overflow-x: auto;
+            }
+            /* 本文セルの中身を横スクロール許可 */
+            table.customtable td .cell-content {
+                display: inline-block;
+                max-width: 150px;
+                white-space: nowrap;
+                overflow-x: auto;
+            }
+            </style>
+            """,
+            unsafe_allow_html=True
+        )
+
+        st.markdown("""
+        **項目定義**:  
+        直近7日間の各種指標をBigQueryで集計。
+        """)
+
+    show_refresh_panel()
 
     # -------------------------------
-    # 2) CSVを読み込む
+    # 2)〜5) 表示用データを読み込む
+    #   列の削除・並び替え・丸め・growth_rate は取得時に計算済み（transform.prepare_view）
     # -------------------------------
-    df = load_data()
+    with perf.span("2-5_load_view") as span:
+        df, meta = load_view()
+        span["rows"] = len(df)
     if df.empty:
         st.warning("まだデータがありません。CSVが空か、データ取得がまだかもしれません。")
+        show_perf_panel(perf)
         return
 
-    # 不要な列削除
-    if "ONTENT_TYPE" in df.columns:
-        df.drop(columns=["ONTENT_TYPE"], inplace=True)
-    if "sum_position" in df.columns:
-        df.drop(columns=["sum_position"], inplace=True)
-
-    # 新規4項目を post_title の直後に挿入
-    new_cols = ["SEO対策KW", "30日間平均順位", "7日間平均順位", "比較（7日間が良ければ＋）"]
-    actual_new_cols = [c for c in new_cols if c in df.columns]
-    if "post_title" in df.columns:
-        idx = df.columns.get_loc("post_title")
-        col_list = list(df.columns)
-        for c in reversed(actual_new_cols):
-            if c in col_list:
-                col_list.remove(c)
-                col_list.insert(idx+1, c)
-        df = df[col_list]
+    # page_view合計(小数点第1位)を表示
+    totals = meta.get("totals", {})
+    if "page_view" in totals:
+        st.metric("page_view の合計", f"{round(totals['page_view'], 1)}")
 
     # -------------------------------
-    # 3) 数値列の丸め処理
+    # 6) Rewrite Priority Score ボタン
     # -------------------------------
-    numeric_cols = df.select_dtypes(include=["float","int"]).columns
-    df[numeric_cols] = df[numeric_cols].round(1)
+    with perf.span("6_rewrite_priority") as span:
+        st.write("### フィルタ & 拡張機能")
+        colA, _ = st.columns([2.5, 7.5])
+        with colA:
+            rewrite_priority_btn = st.button("Rewrite Priority Scoreで降順ソート")
+            st.caption("売上（収益）が発生している記事のみが対象となり、売上、コンバージョン、トラフィック、伸びしろ、検索順位改善の全ての観点から総合的に評価された記事が上位にくる")
+            reset_sort_btn = st.button("元の並びに戻す")
+
+        # カテゴリで絞り込み（カテゴリ→記事の索引で bool マスクを作るだけ）
+        row_mask = None
+        if "category" in df.columns:
+            cat_index = _category_index_cached(meta.get("dataset_key"), df["category"])
+            meta.setdefault("memory", {})["category_index"] = category_index_bytes(cat_index)
+            colC, colM = st.columns([6, 2])
+            with colC:
+                selected_cats = st.multiselect("カテゴリで絞り込み", cat_index["vocab"])
+            with colM:
+                cat_match = st.radio("条件", ["いずれか", "すべて"], horizontal=True)
+            if selected_cats:
+                row_mask = category_mask(cat_index, selected_cats, "all" if cat_match == "すべて" else "any")
+
+        # キーワード検索・数値範囲での絞り込み（これも索引から bool マスクを作り、カテゴリと AND する）
+        search_index = _search_index_cached(meta.get("dataset_key"), df)
+        meta.setdefault("memory", {})["search_index"] = search_index["bytes"]
+        query = st.text_input("キーワード検索（post_title・SEO対策KW の部分一致。スペース区切りで AND）")
+        if query.strip():
+            mask = text_mask(search_index, query)
+            row_mask = mask if row_mask is None else row_mask & mask
+        with st.expander("数値の範囲で絞り込み"):
+            bounds = search_index["bounds"]
+            range_cols = st.columns(max(len(bounds), 1))
+            for i, (name, (lo, hi)) in enumerate(bounds.items()):
+                if lo >= hi:
+                    continue
+                with range_cols[i]:
+                    low, high = st.slider(name, lo, hi, (lo, hi))
+                # 全範囲のままなら絞り込まない（欠損の行も残す）
+                if (low, high) != (lo, hi):
+                    mask = range_mask(search_index, name, low, high)
+                    row_mask = mask if row_mask is None else row_mask & mask
+
+        # ページ切替などの再実行でもソート状態を保持する
+        if rewrite_priority_btn:
+            st.session_state["rewrite_priority_sort"] = True
+        if reset_sort_btn:
+            st.session_state["rewrite_priority_sort"] = False
+
+        # 重みを変えて上位K件だけを表示するモード
+        with st.expander("Rewrite Priority Score の重みを調整（上位K件）"):
+            tune_weights = st.checkbox("調整した重みで上位K件を表示する")
+            weight_cols = st.columns(3)
+            weights = {}
+            for i, (name, default) in enumerate(DEFAULT_WEIGHTS.items()):
+                with weight_cols[i % 3]:
+                    weights[name] = st.slider(f"w: {name}", 0.0, 2.0, float(default), 0.05)
+            top_k = st.selectbox("K（上位件数）", TOP_K_OPTIONS, index=1)
+            st.caption("sales > 0 の記事が対象。avg_position の重みは大きいほど順位の低い記事を下げる。")
+
+        # ---- ここでボタンの処理を実行 (関数内に含める) ----
+        if tune_weights:
+            # 対数変換済みの特徴量は前計算済み → 重み付き和 + 上位K件の部分選択だけ
+            features = _ranking_features_cached(meta.get("dataset_key"), df)
+            df = top_k_rewrite_priority(df, features, weights, top_k, row_mask=row_mask)
+        else:
+            if row_mask is not None:
+                df = df[row_mask]
+            if st.session_state.get("rewrite_priority_sort", False):
+                # sales=0 を除外 → 数値化 → Rewrite Priority Score 計算 → 降順ソート
+                df = rank_rewrite_priority(df)
+        span["rows"] = len(df)
 
     # -------------------------------
-    # 4) page_view合計(小数点第1位)を表示
+    # 7) 並び替え & ページ分割（スライス前に型付きの値でソート）
     # -------------------------------
-    if "page_view" in df.columns:
-        df["page_view_numeric"] = pd.to_numeric(df["page_view"], errors="coerce").fillna(0)
-        total_pv = df["page_view_numeric"].sum()
-        st.metric("page_view の合計", f"{round(total_pv, 1)}")
+    with perf.span("7_sort_paginate") as span:
+        colS, colO, colP, colN = st.columns([3, 2, 2, 2])
+        with colS:
+            sort_col = st.selectbox("並び替え列", ["（指定なし）"] + list(df.columns))
+        with colO:
+            sort_order = st.radio("順序", ["降順", "昇順"], horizontal=True)
+        with colP:
+            page_size = st.selectbox(
+                "表示件数",
+                PAGE_SIZE_OPTIONS,
+                format_func=lambda n: "全件" if n == 0 else f"{n}件",
+            )
+        if sort_col != "（指定なし）":
+            df = sort_frame(df, sort_col, ascending=(sort_order == "昇順"))
+
+        n_pages = page_count(len(df), page_size)
+        with colN:
+            page = st.number_input(f"ページ（全{n_pages}）", min_value=1, max_value=n_pages, value=1, step=1)
+        page_df = page_slice(df, int(page), page_size)
+        st.caption(f"{len(df)}件中 {len(page_df)}件を表示")
+        span["rows"] = len(page_df)
 
     # -------------------------------
-    # 5) growth_rate を「30日間平均順位」「7日間平均順位」から計算
+    # 8) 表示中のページだけ HTML テーブルに変換して表示
     # -------------------------------
-    if "30日間平均順位" in df.columns and "7日間平均順位" in df.columns:
-        df["30日間平均順位"] = pd.to_numeric(df["30日間平均順位"], errors="coerce").fillna(0)
-        df["7日間平均順位"] = pd.to_numeric(df["7日間平均順位"], errors="coerce").fillna(0)
-
-        def calc_growth_rate(row):
-            oldPos = row["30日間平均順位"]
-            newPos = row["7日間平均順位"]
-            if oldPos > 0:
-                return ((oldPos - newPos) / oldPos) * 100
-            else:
-                return 0
-        df["growth_rate"] = df.apply(calc_growth_rate, axis=1)
-        df["growth_rate"] = df["growth_rate"].round(1)
+    with perf.span("8_render_html", rows=len(page_df)):
+        html_table = to_html_table(page_df)
+        st.write(html_table, unsafe_allow_html=True)
 
     # -------------------------------
-    # 6) Rewrite Priority Score ボタン
+    # 9) 絞り込み・並び替え後の全件を型付きの値のままファイルに書き出す（HTML は経由しない）
+    #   表示用データは小数点第1位に丸めてあるので、数値は元の CSV の値に置き換えて出力する
     # -------------------------------
-    st.write("### フィルタ & 拡張機能")
-    colA, _ = st.columns([2.5, 7.5])
-    with colA:
-        rewrite_priority_btn = st.button("Rewrite Priority Scoreで降順ソート")
-        st.caption("売上（収益）が発生している記事のみが対象となり、売上、コンバージョン、トラフィック、伸びしろ、検索順位改善の全ての観点から総合的に評価された記事が上位にくる")
-
-    # ---- ここでボタンの処理を実行 (関数内に含める) ----
-    if rewrite_priority_btn:
-        # (1) sales が 0 の行を除外
-        df = df[pd.to_numeric(df["sales"], errors="coerce").fillna(0) > 0]
-
-        # (2) 数値化処理
-        for cname in ["sales","cv","page_view","imp","growth_rate","avg_position"]:
-            if cname in df.columns:
-                df[cname] = pd.to_numeric(df[cname], errors="coerce").fillna(0)
-
-        # (3) 重み付け
-        w_sales = 1.0    # 売上
-        w_cv    = 1.0    # CV
-        w_pv    = 0.5    # page_view
-        w_imp   = 0.5    # imp（インプレッション）
-        w_gr    = 0.3    # growth_rate（順位改善度合い）
-        w_pos   = 0.2    # avg_position（大きいほどマイナス評価）
-
-        def calc_rp(row):
-            s   = float(row.get("sales", 0))
-            c   = float(row.get("cv", 0))
-            pv  = float(row.get("page_view", 0))
-            imp = float(row.get("imp", 0))
-            gr  = float(row.get("growth_rate", 0))     
-            pos = float(row.get("avg_position", 9999))
-
-            score = (np.log(s+1) * w_sales
-                     + c           * w_cv
-                     + np.log(pv+1)* w_pv
-                     + np.log(imp+1)* w_imp
-                     + gr          * w_gr
-                     - pos         * w_pos)
-            return score
-
-        # (4) Rewrite Priority Score 計算・ソート
-        df["rewrite_priority"] = df.apply(calc_rp, axis=1)
-        df.sort_values("rewrite_priority", ascending=False, inplace=True)
+    with st.expander("エクスポート（絞り込み・並び替え後の全件）"):
+        export_fmt = st.radio("形式", list(EXPORT_FORMATS), horizontal=True)
+        st.caption("数値は表示用に丸める前の値を、growth_rate・rewrite_priority は表と同じ値を出力します。表示中のページだけでなく全件が対象です。")
+        csv_path, csv_mtime_ns, csv_size = meta["csv_key"]
+        stat = os.stat(csv_path)
+        if (stat.st_mtime_ns, stat.st_size) != (csv_mtime_ns, csv_size):
+            st.warning("データが更新されました。ページを再読み込みしてからエクスポートしてください。")
+        elif st.button("エクスポートを作成"):
+            with perf.span("9_export", rows=len(df)):
+                # 元の CSV はエクスポートのときだけ読む（表示用データと同じ行順・index）
+                raw = read_sheet_csv(csv_path)
+                # チャンクごとに一時ファイルへ書き、ダウンロードボタンに渡したら消す
+                path = export_frame(df, export_fmt, raw=raw)
+                try:
+                    suffix, mime = EXPORT_FORMATS[export_fmt]
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            f"{export_fmt} をダウンロード（{len(df)}件）",
+                            f,
+                            file_name=f"ga_metrics_{datetime.now():%Y%m%d_%H%M%S}{suffix}",
+                            mime=mime,
+                        )
+                finally:
+                    os.remove(path)
+
+    show_perf_panel(perf, meta.get("memory"))
+
+# 履歴タブで選べる指標
+HISTORY_METRICS = ["sales", "avg_position", "rewrite_priority", "growth_rate", "page_view", "imp", "cv"]
+
+# 履歴タブの記事検索で候補に出す最大件数
+HISTORY_MAX_OPTIONS = 50
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _history_posts_cached(signature: tuple, latest: date) -> tuple:
+    """
+    最新日のスナップショットの記事一覧（POST_ID / post_title / SEO対策KW）と、その検索索引。
+    signature（パーティションのファイル名・mtime・サイズ）が変わらない限り読み直さない。
+    再実行ごとのコピーを避けるため cache_resource で共有する（読み取り専用で使う）。
+    """
+    posts = load_snapshots(latest, latest, columns=["POST_ID", "post_title", "SEO対策KW"])
+    posts = posts[posts["POST_ID"].fillna("") != ""].reset_index(drop=True)
+    return posts, build_search_index(posts, range_fields=[])
 
-    # -------------------------------
-    # 7) 表示用: セル横スクロール対応
-    # -------------------------------
-    def wrap_cell(val):
-        s = str(val)
-        s_esc = html.escape(s)
-        return f'<div class="cell-content">{s_esc}</div>'
-
-    if "URL" in df.columns:
-        def clickable_url(cell):
-            cell_str = str(cell)
-            if cell_str.startswith("http"):
-                esc = html.escape(cell_str)
-                return f'<div class="cell-content" style="text-align:right;"><a href="{esc}" target="_blank">{esc}</a></div>'
-            else:
-                return f'<div class="cell-content" style="text-align:right;">{html.escape(cell_str)}</div>'
-        df["URL"] = df["URL"].apply(clickable_url)
-
-    for col in df.columns:
-        if col != "URL":
-            df[col] = df[col].apply(wrap_cell)
-
-    new_cols = []
-    for c in df.columns:
-        c_esc = html.escape(c)
-        new_cols.append(f'<div class="header-content">{c_esc}</div>')
-    df.columns = new_cols
+@st.cache_data(show_spinner=False, max_entries=32)
+def _history_cached(signature: tuple, start: date, end: date, metrics: tuple, post_id: str) -> pd.DataFrame:
+    """
+    1記事・指定期間・指定列の推移（signature が同じなら再実行をまたいで使い回す）。
+    """
+    return load_snapshots(start, end, columns=list(metrics), post_ids=[post_id])
 
-    # -------------------------------
-    # 8) HTMLテーブルに変換して表示
-    # -------------------------------
-    html_table = df.to_html(
-        escape=False,
-        index=False,
-        classes=["customtable"]
-    )
-    st.write(html_table, unsafe_allow_html=True)
+def show_history():
+    """
+    日付ごとのスナップショットから、記事単位の指標推移を表示する。
+    - 指定した期間のパーティション・指定した列だけを読み込む
+    - 記事一覧・推移はパーティションの mtime をキーにキャッシュし、他タブの操作による再実行では読み直さない
+    - 最新日と7日前の値を比較（前週比）
+    - 値は Data Viewer の表と同じ丸め・スコアで表示する
+    """
+    st.write("### 記事ごとの推移")
+    dates = list_snapshot_dates()
+    if not dates:
+        st.info("まだスナップショットがありません。データ取得を実行すると日付ごとに蓄積されます。")
+        return
+    signature = snapshot_signature()
+    posts, posts_index = _history_posts_cached(signature, dates[-1])
+    titles = dict(zip(posts["POST_ID"].tolist(), posts["post_title"].tolist()))
+
+    colD, colP, colM = st.columns([3, 4, 4])
+    with colD:
+        default_start = max(dates[0], dates[-1] - timedelta(days=28))
+        date_range = st.date_input(
+            "期間",
+            value=(default_start, dates[-1]),
+            min_value=dates[0],
+            max_value=dates[-1],
+        )
+    with colP:
+        # 全記事を選択肢にすると再実行ごとに全件のラベルを送ることになるので、検索で絞ってから選ぶ
+        query = st.text_input("記事を検索（post_title・SEO対策KW）")
+        if query.strip():
+            matches = posts["POST_ID"].to_numpy()[text_mask(posts_index, query)][:HISTORY_MAX_OPTIONS].tolist()
+            post_id = st.selectbox(
+                f"記事（上位{HISTORY_MAX_OPTIONS}件まで）", matches, format_func=lambda p: f"{p}: {titles.get(p, '')}"
+            )
+        else:
+            first = posts["POST_ID"].iloc[0] if len(posts) else ""
+            post_id = st.text_input("POST_ID", value=first).strip()
+            if post_id in titles:
+                st.caption(titles[post_id])
+    with colM:
+        metrics = st.multiselect("指標", HISTORY_METRICS, default=["sales", "avg_position", "rewrite_priority"])
+
+    if not isinstance(date_range, (list, tuple)) or len(date_range) != 2:
+        st.info("期間の開始日と終了日を選択してください。")
+        return
+    if not post_id or not metrics:
+        return
+
+    hist = _history_cached(signature, date_range[0], date_range[1], tuple(metrics), str(post_id))
+    if hist.empty:
+        st.warning("選択した期間にこの記事のデータがありません。")
+        return
+    hist = hist.set_index("date")
+    # 表と同じく、指標は小数点第1位に丸めて表示する（rewrite_priority は表でも丸めない）
+    rounded = [m for m in metrics if m in hist.columns and m != "rewrite_priority"]
+    hist[rounded] = hist[rounded].round(1)
+
+    # 前週比: 最新日と、その7日前以前で最も近い日の値を比較
+    last_day = hist.index.max()
+    prev = hist[hist.index <= last_day - timedelta(days=7)]
+    cols = st.columns(len(metrics))
+    for col, m in zip(cols, metrics):
+        if m not in hist.columns:
+            continue
+        cur = hist[m].iloc[-1]
+        delta = None
+        if not prev.empty and pd.notna(prev[m].iloc[-1]) and pd.notna(cur):
+            delta = round(float(cur - prev[m].iloc[-1]), 2)
+        with col:
+            # 順位は小さいほど良いので色を反転
+            st.metric(
+                f"{m}（前週比）",
+                "-" if pd.isna(cur) else round(float(cur), 2),
+                delta,
+                delta_color="inverse" if m == "avg_position" else "normal",
+            )
+
+    for m in metrics:
+        if m in hist.columns:
+            st.write(f"**{m}**")
+            st.line_chart(hist[[m]])
 
 ###################################
 # (Hidden) README doc
@@ -318,6 +608,12 @@ README_TEXT = """\
    - 「Rewrite Priority Scoreで降順ソート」ボタンを押すと、売上>0の記事のみを対象にスコアを計算し、上位から並べ替えます。
 2. **上位記事からリライト**  
    - 収益・検索効果の改善が見込める優先度の高い記事を優先的に強化することで、リライト施策の効率が上がります。
+3. **重みを調整して比較（任意）**  
+   - 「Rewrite Priority Score の重みを調整（上位K件）」で各重みと K を変えると、その重みでの上位K件がすぐに表示されます。
+4. **絞り込み（任意）**  
+   - カテゴリ、キーワード（post_title・SEO対策KW の部分一致）、sales / avg_position / growth_rate の範囲で対象記事を絞り込めます。スコア計算・ソートは絞り込み後の記事だけが対象です。
+5. **エクスポート（任意）**  
+   - 「エクスポート」で、絞り込み・並び替え後の全件（growth_rate・rewrite_priority を含む）を CSV または Parquet でダウンロードできます。HTML テーブルからコピーする必要はありません。
 
 ---
 
@@ -347,10 +643,12 @@ def show_sheet2():
     st.markdown(README_TEXT)
 
 def streamlit_main():
-    tab1, tab2 = st.tabs(["📊 Data Viewer", "📖 README"])
+    tab1, tab2, tab3 = st.tabs(["📊 Data Viewer", "📈 History", "📖 README"])
     with tab1:
         show_sheet1()
     with tab2:
+        show_history()
+    with tab3:
         show_sheet2()
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+import html
+import math
+import pandas as pd
+
+# 1ページあたりの行数の選択肢（0 = 全件表示）
+PAGE_SIZE_OPTIONS = [50, 100, 200, 500, 0]
+
+def wrap_cell(val) -> str:
+    """
+    セルを横スクロール可能な div で包む（HTMLエスケープ済み）。
+    """
+    s = str(val)
+    s_esc = html.escape(s)
+    return f'<div class="cell-content">{s_esc}</div>'
+
+def clickable_url(cell) -> str:
+    """
+    http で始まる値はリンクに、それ以外はエスケープした文字列として右寄せ表示する。
+    """
+    cell_str = str(cell)
+    if cell_str.startswith("http"):
+        esc = html.escape(cell_str)
+        return f'<div class="cell-content" style="text-align:right;"><a href="{esc}" target="_blank">{esc}</a></div>'
+    else:
+        return f'<div class="cell-content" style="text-align:right;">{html.escape(cell_str)}</div>'
+
+def sort_frame(df: pd.DataFrame, sort_col: str = None, ascending: bool = False) -> pd.DataFrame:
+    """
+    型付きの値のままソートする（欠損は末尾）。sort_col が無ければそのまま返す。
+    """
+    if not sort_col or sort_col not in df.columns:
+        return df
+    return df.sort_values(sort_col, ascending=ascending, kind="mergesort", na_position="last")
+
+def page_count(n_rows: int, page_size: int = None) -> int:
+    """
+    ページ数（最低1）。page_size が 0 なら全件1ページ。
+    """
+    if not page_size:
+        return 1
+    return max(1, math.ceil(n_rows / page_size))
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int = None) -> pd.DataFrame:
+    """
+    1始まりの page 番目の行だけを切り出す。page_size が 0 なら全件。
+    """
+    if not page_size:
+        return df
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+def to_html_table(df: pd.DataFrame) -> str:
+    """
+    渡された行だけを customtable 形式の HTML に変換する。
+    ページ単位で呼ぶことで、マークアップ生成のコストを表示行数に比例させる。
+    値は numpy のスカラーのまま文字列にする（tolist() だと float32 が Python の float に広がり、
+    4.3 が 4.300000190734863 のように表示されるため）。
+    """
+    cells = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col == "URL":
+            cells[col] = [clickable_url(v) for v in values]
+        else:
+            cells[col] = [wrap_cell(v) for v in values]
+    view = pd.DataFrame(cells, columns=list(df.columns))
+    view.columns = [f'<div class="header-content">{html.escape(str(c))}</div>' for c in df.columns]
+
+    return view.to_html(
+        escape=False,
+        index=False,
+        classes=["customtable"]
+    )
@@ -0,0 +1,122 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import iter_sheet_csv
+from scoring import calc_growth_rate
+
+VIEW_PATH = "sheet_query_view.parquet"
+
+# Parquet のメタデータに JSON で埋め込むキー
+VIEW_META_KEY = "ga_metrics_view"
+
+# 表示しない列
+HIDDEN_COLUMNS = ["ONTENT_TYPE", "sum_position"]
+
+# post_title の直後に並べる4項目
+SEO_COLUMNS = ["SEO対策KW", "30日間平均順位", "7日間平均順位", "比較（7日間が良ければ＋）"]
+
+def prepare_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    型付け済みの DataFrame を表示用に整える（副作用なしの純粋関数）。
+    - ONTENT_TYPE / sum_position 列を削除
+    - SEO 関連の4項目を post_title の直後に移動
+    - 数値列を小数点第1位で丸める
+    - growth_rate を「30日間平均順位」「7日間平均順位」から計算
+    行単位の処理だけなので、チャンクごとに呼んでも結果は同じ。
+    """
+    df = df.drop(columns=[c for c in HIDDEN_COLUMNS if c in df.columns])
+
+    # 新規4項目を post_title の直後に挿入
+    actual_new_cols = [c for c in SEO_COLUMNS if c in df.columns]
+    if "post_title" in df.columns:
+        col_list = [c for c in df.columns if c not in actual_new_cols]
+        idx = col_list.index("post_title")
+        col_list[idx+1:idx+1] = actual_new_cols
+        df = df[col_list]
+
+    # 数値列の丸め処理
+    df = df.copy()
+    numeric_cols = df.select_dtypes(include=["float","int"]).columns
+    df[numeric_cols] = df[numeric_cols].round(1)
+
+    # growth_rate を「30日間平均順位」「7日間平均順位」から計算
+    if "30日間平均順位" in df.columns and "7日間平均順位" in df.columns:
+        df["30日間平均順位"] = df["30日間平均順位"].fillna(0)
+        df["7日間平均順位"] = df["7日間平均順位"].fillna(0)
+        df["growth_rate"] = calc_growth_rate(df)
+    return df
+
+def view_totals(view: pd.DataFrame) -> dict:
+    """
+    表示用 DataFrame の合計値（現在は page_view のみ）。
+    """
+    totals = {}
+    if "page_view" in view.columns:
+        totals["page_view"] = float(view["page_view"].fillna(0).sum())
+    return totals
+
+def write_view(csv_path: str, view_path: str = VIEW_PATH, source_fingerprint: str = None, chunk_rows: int = 50000) -> dict:
+    """
+    CSV をチャンクごとに prepare_view して、表示用の Parquet を書き出す。
+    合計値・列順・型・元 CSV の fingerprint はメタデータとしてファイルに埋め込む。
+    一時ファイルに書いてから置き換える。書き込んだメタデータを返す（データが無ければ None）。
+    """
+    tmp_path = view_path + ".tmp"
+    writer = None
+    rows = 0
+    page_view_total = 0.0
+    try:
+        for chunk in iter_sheet_csv(csv_path, chunk_rows):
+            view = prepare_view(chunk)
+            if writer is None:
+                table = pa.Table.from_pandas(view, preserve_index=False)
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression="zstd")
+                columns = list(view.columns)
+                dtypes = {c: str(t) for c, t in view.dtypes.items()}
+            else:
+                table = pa.Table.from_pandas(view, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(view)
+            page_view_total += view_totals(view).get("page_view", 0.0)
+
+        if writer is None:
+            return None
+
+        meta = {
+            "source_fingerprint": source_fingerprint,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "rows": rows,
+            "columns": columns,
+            "dtypes": dtypes,
+            "totals": {"page_view": page_view_total} if "page_view" in columns else {},
+        }
+        writer.add_key_value_metadata({VIEW_META_KEY: json.dumps(meta, ensure_ascii=False)})
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, view_path)
+    return meta
+
+def _decode_meta(file_meta) -> dict:
+    raw = (file_meta.metadata or {}).get(VIEW_META_KEY.encode())
+    return json.loads(raw) if raw else {}
+
+def read_view_meta(view_path: str = VIEW_PATH) -> dict:
+    """
+    表示用 Parquet のメタデータだけを読む（データ本体は読まない）。無ければ {}。
+    """
+    if not os.path.exists(view_path):
+        return {}
+    return _decode_meta(pq.read_metadata(view_path))
+
+def read_view(view_path: str = VIEW_PATH):
+    """
+    表示用 Parquet を (DataFrame, メタデータ) として読み込む。
+    """
+    pf = pq.ParquetFile(view_path)
+    return pf.read().to_pandas(), _decode_meta(pf.metadata)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# src/ のモジュールはアプリと同じくフラットに import する（from data_loader import ...）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
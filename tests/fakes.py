@@ -0,0 +1,86 @@
+import threading
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+class FakeAPIError(Exception):
+    """
+    gspread.exceptions.APIError と同じく response.status_code を持つ例外。
+    """
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+class FakeWorksheet:
+    """
+    gspread の Worksheet の代わり（get / get_all_values / row_count だけ）。
+    - rows: シートの内容（行のリスト）。空リストの行は空行
+    - row_count: シートの行数（既定は rows より 100 行多い = 末尾に空行がある状態）
+    - latency: 1回の API 呼び出しにかかる秒数
+    - fail_first / fail_status: 最初の fail_first 回の呼び出しを fail_status のエラーにする
+    get は実際の API と同じく、範囲末尾の空行と各行末尾の空セルを返さない。
+    """
+
+    def __init__(self, rows: list, row_count: int = None, latency: float = 0.0,
+                 fail_first: int = 0, fail_status: int = 429):
+        self.rows = [list(r) for r in rows]
+        self.row_count = len(rows) + 100 if row_count is None else row_count
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self):
+        # time.sleep はテストで差し替えるので、待ち時間には Event.wait を使う
+        if self.latency:
+            threading.Event().wait(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.fail_first:
+                raise FakeAPIError(self.fail_status)
+
+    def get(self, range_name: str) -> list:
+        self._call()
+        start, end = (int(x) for x in range_name.split(":"))
+        out = [list(r) for r in self.rows[start - 1:end]]
+        out = [r[:max((i + 1 for i, v in enumerate(r) if v != ""), default=0)] for r in out]
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    def get_all_values(self) -> list:
+        self._call()
+        out = [list(r) for r in self.rows]
+        while out and not any(v != "" for v in out[-1]):
+            out.pop()
+        if not out:
+            return []
+        width = max(len(r) for r in out)
+        return [r + [""] * (width - len(r)) for r in out]
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet: FakeWorksheet):
+        self._worksheet = worksheet
+
+    def worksheet(self, name: str) -> FakeWorksheet:
+        return self._worksheet
+
+class FakeClient:
+    """
+    gspread のクライアントの代わり。spreadsheet_key → FakeWorksheet の dict を渡す。
+    無いキーは 404、forbidden に含まれるキーは 403（リトライしないエラー）にする。
+    """
+
+    def __init__(self, sheets: dict, forbidden: tuple = ()):
+        self.sheets = sheets
+        self.forbidden = set(forbidden)
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        if key in self.forbidden:
+            raise FakeAPIError(403)
+        if key not in self.sheets:
+            raise FakeAPIError(404)
+        return FakeSpreadsheet(self.sheets[key])
@@ -0,0 +1,44 @@
+import csv
+
+import numpy as np
+
+from change_detection import diff_csv, row_fingerprints
+
+HEADER = ["POST_ID", "post_title", "sales"]
+
+def write_csv(path, rows, header=HEADER):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerows([header] + rows)
+    return str(path)
+
+def test_diff_by_post_id(tmp_path):
+    old = write_csv(tmp_path / "old.csv", [["1", "a", "10"], ["2", "b", "20"], ["3", "c", "30"]])
+    new = write_csv(tmp_path / "new.csv", [["3", "c", "31"], ["1", "a", "10"], ["4", "d", "40"]])
+    assert diff_csv(old, new) == {"added": ["4"], "removed": ["2"], "changed": ["3"]}
+
+def test_keys_are_reported_in_file_order(tmp_path):
+    old = write_csv(tmp_path / "old.csv", [[str(i), "x", "0"] for i in range(10)])
+    new = write_csv(tmp_path / "new.csv", [[str(i), "y", "0"] for i in (7, 2, 9)] + [["12", "n", "0"], ["11", "n", "0"]])
+    diff = diff_csv(old, new)
+    assert diff["changed"] == ["7", "2", "9"]
+    assert diff["added"] == ["12", "11"]
+    assert diff["removed"] == ["0", "1", "3", "4", "5", "6", "8"]
+
+def test_duplicate_keys_use_the_last_row(tmp_path):
+    old = write_csv(tmp_path / "old.csv", [["1", "a", "10"], ["1", "a", "11"]])
+    new = write_csv(tmp_path / "new.csv", [["1", "a", "11"]])
+    assert diff_csv(old, new) == {"added": [], "removed": [], "changed": []}
+
+def test_rows_without_key_are_compared_by_content(tmp_path):
+    header = ["post_title", "sales"]
+    old = write_csv(tmp_path / "old.csv", [["a", "10"], ["b", "20"]], header)
+    new = write_csv(tmp_path / "new.csv", [["a", "10"], ["b", "21"]], header)
+    diff = diff_csv(old, new)
+    assert diff["changed"] == []
+    assert len(diff["added"]) == 1 and len(diff["removed"]) == 1
+
+def test_fingerprints_are_compact_arrays(tmp_path):
+    path = write_csv(tmp_path / "big.csv", [[str(i), f"title {i}", str(i)] for i in range(5000)])
+    keys, rows = row_fingerprints(path)
+    assert keys.dtype == np.uint64 and rows.dtype == np.uint64
+    assert len(keys) == 5000 and (keys[1:] > keys[:-1]).all()
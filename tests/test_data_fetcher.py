@@ -0,0 +1,166 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+import data_fetcher
+from fakes import FakeAPIError, FakeClient, FakeWorksheet
+
+HEADER = ["POST_ID", "URL", "post_title", "sales"]
+
+def sheet_rows(n: int, offset: int = 0) -> list:
+    return [HEADER] + [[str(offset + i), f"https://example.com/{offset + i}", f"title {i}", str(i * 10)] for i in range(n)]
+
+def make_source(tmp_path, name: str, key: str = None) -> dict:
+    return {
+        "name": name,
+        "spreadsheet_key": key or name,
+        "sheet_name": "query",
+        "output": str(tmp_path / f"{name}.csv"),
+    }
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    バックオフの待ちを実際には行わず、待とうとした秒数だけ記録する。
+    """
+    delays = []
+    monkeypatch.setattr(data_fetcher.time, "sleep", delays.append)
+    monkeypatch.setattr(data_fetcher.random, "uniform", lambda a, b: b)
+    return delays
+
+def test_retry_429_then_succeed(sleeps):
+    ws = FakeWorksheet(sheet_rows(3), fail_first=2, fail_status=429)
+    assert data_fetcher.call_with_retry(ws.get_all_values, base_delay=1.0) == sheet_rows(3)
+    assert ws.calls == 3
+    # full jitter の上限は base_delay * 2**attempt（uniform を上限値に固定している）
+    assert sleeps == [1.0, 2.0]
+
+def test_retry_gives_up_after_max_retries(sleeps):
+    ws = FakeWorksheet(sheet_rows(3), fail_first=10, fail_status=503)
+    with pytest.raises(FakeAPIError):
+        data_fetcher.call_with_retry(ws.get_all_values, max_retries=3, base_delay=1.0, max_delay=2.0)
+    assert ws.calls == 4
+    assert sleeps == [1.0, 2.0, 2.0]
+
+def test_non_retryable_error_is_raised_immediately(sleeps):
+    ws = FakeWorksheet(sheet_rows(3), fail_first=1, fail_status=403)
+    with pytest.raises(FakeAPIError) as exc:
+        data_fetcher.call_with_retry(ws.get_all_values)
+    assert exc.value.response.status_code == 403
+    assert ws.calls == 1
+    assert sleeps == []
+
+@pytest.mark.parametrize("chunk_rows", [None, 2])
+def test_quota_errors_are_retried_during_fetch(tmp_path, sleeps, chunk_rows):
+    source = make_source(tmp_path, "a")
+    client = FakeClient({"a": FakeWorksheet(sheet_rows(5), fail_first=3)})
+    [result] = data_fetcher.main_fetch_all(chunk_rows=chunk_rows, sources=[source], client=client)
+    assert result["rows"] == 5
+    assert len(sleeps) == 3
+    assert pd.read_csv(source["output"], encoding="utf-8-sig")["POST_ID"].tolist() == list(range(5))
+
+def test_failing_source_does_not_block_others(tmp_path, sleeps):
+    sources = [make_source(tmp_path, name) for name in ("a", "bad", "c")]
+    client = FakeClient(
+        {"a": FakeWorksheet(sheet_rows(3)), "c": FakeWorksheet(sheet_rows(4, offset=100))},
+        forbidden=("bad",),
+    )
+    with pytest.raises(RuntimeError, match="bad"):
+        data_fetcher.main_fetch_all(sources=sources, client=client)
+    assert len(pd.read_csv(tmp_path / "a.csv", encoding="utf-8-sig")) == 3
+    assert len(pd.read_csv(tmp_path / "c.csv", encoding="utf-8-sig")) == 4
+    assert not (tmp_path / "bad.csv").exists()
+
+def test_wall_time_close_to_slowest_source(tmp_path, sleeps):
+    latencies = {"a": 0.2, "b": 0.3, "c": 0.4}
+    sources = [make_source(tmp_path, name) for name in latencies]
+    client = FakeClient({name: FakeWorksheet(sheet_rows(3), latency=lat) for name, lat in latencies.items()})
+    started = time.perf_counter()
+    results = data_fetcher.main_fetch_all(sources=sources, client=client, max_workers=len(sources))
+    elapsed = time.perf_counter() - started
+    assert len(results) == 3
+    # 直列なら 0.9 秒。並行なら一番遅い 0.4 秒に近くなる
+    assert 0.4 <= elapsed < 0.75
+
+def test_unchanged_fetch_is_skipped(tmp_path, sleeps):
+    source = make_source(tmp_path, "a")
+    client = FakeClient({"a": FakeWorksheet(sheet_rows(3))})
+    [first] = data_fetcher.main_fetch_all(sources=[source], client=client)
+    [second] = data_fetcher.main_fetch_all(sources=[source], client=client)
+    assert first["changed"] and not second["changed"]
+
+def test_load_sources_rejects_shared_paths(tmp_path):
+    sources = [
+        {"name": "a", "spreadsheet_key": "k1", "sheet_name": "s", "output": "a.csv", "snapshot_dir": "snapshots"},
+        {"name": "b", "spreadsheet_key": "k2", "sheet_name": "s", "output": "b.csv", "snapshot_dir": "./snapshots/"},
+    ]
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps(sources), encoding="utf-8")
+    with pytest.raises(ValueError, match="snapshot_dir"):
+        data_fetcher.load_sources(str(path))
+
+def bulk_csv(worksheet, path) -> bytes:
+    """
+    一括取得（get_all_values）の経路で書き出した CSV のバイト列。
+    """
+    data_fetcher.fetch_all_values(worksheet).to_csv(path, index=False, encoding="utf-8-sig")
+    return path.read_bytes()
+
+def gappy_rows() -> list:
+    """
+    途中に空行があり、行末の空セルが欠けている（API が省略する）シート。
+    """
+    rows = sheet_rows(12)
+    rows[3][3] = ""          # 行末の空セル → get では短い行になる
+    rows[7][2:] = ["", ""]   # 行末に空セルが2つ
+    return rows[:5] + [[], [], []] + rows[5:9] + [[]] + rows[9:]
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 5, 7, 100])
+def test_stream_matches_bulk_fetch(tmp_path, chunk_rows):
+    ws = FakeWorksheet(gappy_rows())
+    expected = bulk_csv(ws, tmp_path / "bulk.csv")
+    n_rows = data_fetcher.stream_worksheet_to_csv(ws, str(tmp_path / "stream.csv"), chunk_rows)
+    assert (tmp_path / "stream.csv").read_bytes() == expected
+    assert n_rows == len(pd.read_csv(tmp_path / "bulk.csv", encoding="utf-8-sig", skip_blank_lines=False))
+
+def test_stream_keeps_interior_blank_rows_and_drops_trailing_ones():
+    rows = gappy_rows()
+    ws = FakeWorksheet(rows, row_count=len(rows) + 50)
+    chunks = list(data_fetcher.iter_worksheet_chunks(ws, 4))
+    fetched = [r for chunk in chunks for r in chunk]
+    # 途中の空行は残り、シート末尾の 50 行の空行は出力されない
+    assert len(fetched) == len(rows)
+    assert [i for i, r in enumerate(fetched) if not r] == [i for i, r in enumerate(rows) if not r]
+
+def test_stream_pads_trimmed_cells_to_header_width(tmp_path):
+    data_fetcher.stream_worksheet_to_csv(FakeWorksheet(gappy_rows()), str(tmp_path / "s.csv"), 4)
+    lines = (tmp_path / "s.csv").read_text(encoding="utf-8-sig").splitlines()
+    assert all(line.count(",") == len(HEADER) - 1 for line in lines if line)
+
+@pytest.mark.parametrize("chunk_rows", [1, 10])
+def test_stream_empty_sheet(tmp_path, chunk_rows):
+    ws = FakeWorksheet([], row_count=20)
+    expected = bulk_csv(ws, tmp_path / "bulk.csv")
+    assert data_fetcher.stream_worksheet_to_csv(ws, str(tmp_path / "stream.csv"), chunk_rows) == 0
+    assert (tmp_path / "stream.csv").read_bytes() == expected
+
+@pytest.mark.parametrize("chunk_rows", [None, 2])
+def test_failed_snapshot_is_retried_on_next_fetch(tmp_path, sleeps, monkeypatch, chunk_rows):
+    source = dict(make_source(tmp_path, "a"), snapshot_dir=str(tmp_path / "snapshots"))
+    client = FakeClient({"a": FakeWorksheet(sheet_rows(3))})
+    real = data_fetcher.write_snapshot_chunks if chunk_rows else data_fetcher.write_snapshot
+    name = "write_snapshot_chunks" if chunk_rows else "write_snapshot"
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(data_fetcher, name, fail)
+    with pytest.raises(RuntimeError):
+        data_fetcher.main_fetch_all(chunk_rows=chunk_rows, sources=[source], client=client)
+    assert not (tmp_path / "a.csv").exists()
+
+    monkeypatch.setattr(data_fetcher, name, real)
+    [result] = data_fetcher.main_fetch_all(chunk_rows=chunk_rows, sources=[source], client=client)
+    assert result["changed"]
+    assert len(list((tmp_path / "snapshots").glob("date=*/part-0.parquet"))) == 1
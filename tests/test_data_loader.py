@@ -0,0 +1,47 @@
+import csv
+import os
+from datetime import date
+
+import pandas as pd
+
+from compact import compact_frame
+from data_loader import iter_sheet_csv, read_sheet_csv
+from snapshot_store import write_snapshot_chunks
+from transform import prepare_view
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sheet_query_data.csv")
+
+def raw_post_ids() -> list:
+    with open(SAMPLE_CSV, encoding="utf-8-sig", newline="") as f:
+        return [row["POST_ID"] for row in csv.DictReader(f)]
+
+def test_non_numeric_post_ids_are_kept():
+    """
+    数値でない POST_ID（"app" / "mobile" / "www"）が欠損にならず、表示用・省メモリ化の後もそのまま残ること。
+    """
+    expected = raw_post_ids()
+    assert {"app", "mobile", "www"} <= set(expected)
+    df = read_sheet_csv(SAMPLE_CSV)
+    assert df["POST_ID"].tolist() == expected
+    view = compact_frame(prepare_view(df))
+    assert view["POST_ID"].astype(str).tolist() == expected
+
+def write_csv_with_new_column(path) -> str:
+    """
+    SCHEMA に無い列を足した CSV。最初のチャンクでは空・数値、後のチャンクで文字列になる。
+    """
+    with open(SAMPLE_CSV, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))[:21]
+    rows[0].append("new_col")
+    for i, row in enumerate(rows[1:]):
+        row.append("" if i < 3 else "1" if i < 7 else "text")
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+def test_unknown_columns_have_one_type_across_chunks(tmp_path):
+    path = write_csv_with_new_column(tmp_path / "new.csv")
+    chunks = list(iter_sheet_csv(path, 5))
+    assert {str(c["new_col"].dtype) for c in chunks} == {str(read_sheet_csv(path)["new_col"].dtype)}
+    written = write_snapshot_chunks(iter_sheet_csv(path, 5), date(2026, 1, 1), root=str(tmp_path / "snapshots"))
+    assert pd.read_parquet(written)["new_col"].tolist() == [""] * 3 + ["1"] * 4 + ["text"] * 13
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+from compact import compact_frame
+from data_loader import read_sheet_csv
+from export import export_frame
+from scoring import rank_rewrite_priority
+from transform import prepare_view
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sheet_query_data.csv")
+
+def read_export(path: str, fmt: str) -> pd.DataFrame:
+    if fmt == "CSV":
+        return pd.read_csv(path, encoding="utf-8-sig", dtype={"POST_ID": str}, keep_default_na=False, na_values=[""])
+    return pd.read_parquet(path)
+
+@pytest.mark.parametrize("fmt", ["CSV", "Parquet"])
+def test_export_uses_unrounded_values(tmp_path, fmt):
+    """
+    表示用の丸め（小数点第1位）を出力に持ち込まず、growth_rate・rewrite_priority は表と同じ値になること。
+    """
+    raw = read_sheet_csv(SAMPLE_CSV)
+    view = rank_rewrite_priority(compact_frame(prepare_view(raw)))
+    out = read_export(export_frame(view, fmt, str(tmp_path), chunk_rows=7, raw=raw), fmt)
+
+    assert out["POST_ID"].tolist() == raw.loc[view.index, "POST_ID"].tolist()
+    for col in ["search_ctr", "cvr", "article_ctr", "avg_position"]:
+        assert out[col].tolist() == pytest.approx(raw.loc[view.index, col].tolist(), nan_ok=True)
+    assert out["search_ctr"].nunique() > view["search_ctr"].nunique()
+    for col in ["growth_rate", "rewrite_priority"]:
+        assert out[col].tolist() == pytest.approx(view[col].tolist())
@@ -0,0 +1,38 @@
+import json
+import logging
+
+import pytest
+
+import perf
+
+@pytest.fixture
+def perf_logger():
+    """
+    ga_metrics.perf のハンドラ・レベルをテストの前後で元に戻す。
+    """
+    saved = (list(perf.logger.handlers), perf.logger.level, perf.logger.propagate)
+    perf.logger.handlers.clear()
+    perf.logger.setLevel(logging.NOTSET)
+    yield perf.logger
+    perf.logger.handlers[:] = saved[0]
+    perf.logger.setLevel(saved[1])
+    perf.logger.propagate = saved[2]
+
+def test_spans_are_logged_without_basic_config(perf_logger, capsys):
+    perf.configure_logging()
+    perf.configure_logging()  # アプリの再実行ごとに呼ばれても1つだけ
+    assert len(perf_logger.handlers) == 1
+
+    recorder = perf.PerfRecorder("show_sheet1")
+    with recorder.span("load", rows=10):
+        pass
+    [line] = capsys.readouterr().err.splitlines()
+    record = json.loads(line)
+    assert record["run"] == "show_sheet1" and record["name"] == "load" and record["rows"] == 10
+
+def test_log_level_from_env(perf_logger, monkeypatch, capsys):
+    monkeypatch.setenv(perf.LOG_LEVEL_ENV, "warning")
+    perf.configure_logging()
+    with perf.PerfRecorder("show_sheet1").span("load"):
+        pass
+    assert capsys.readouterr().err == ""
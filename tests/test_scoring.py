@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import read_sheet_csv
+from scoring import (
+    calc_growth_rate,
+    calc_rewrite_priority,
+    rank_rewrite_priority,
+    ranking_features,
+    top_k_indices,
+    top_k_rewrite_priority,
+)
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sheet_query_data.csv")
+
+def old_growth_rate(df: pd.DataFrame) -> pd.Series:
+    """
+    ベクトル化する前の、行ごとの growth_rate（元の streamlit_app.py のまま）。
+    """
+    df = df.copy()
+    df["30日間平均順位"] = pd.to_numeric(df["30日間平均順位"], errors="coerce").fillna(0)
+    df["7日間平均順位"] = pd.to_numeric(df["7日間平均順位"], errors="coerce").fillna(0)
+
+    def calc_growth_rate(row):
+        oldPos = row["30日間平均順位"]
+        newPos = row["7日間平均順位"]
+        if oldPos > 0:
+            return ((oldPos - newPos) / oldPos) * 100
+        else:
+            return 0
+    return df.apply(calc_growth_rate, axis=1).round(1)
+
+def old_rewrite_priority(df: pd.DataFrame) -> pd.Series:
+    """
+    ベクトル化する前の、行ごとの Rewrite Priority Score（数値化済みの df に対して）。
+    """
+    def calc_rp(row):
+        s   = float(row.get("sales", 0))
+        c   = float(row.get("cv", 0))
+        pv  = float(row.get("page_view", 0))
+        imp = float(row.get("imp", 0))
+        gr  = float(row.get("growth_rate", 0))
+        pos = float(row.get("avg_position", 9999))
+        return (np.log(s+1) * 1.0
+                + c           * 1.0
+                + np.log(pv+1)* 0.5
+                + np.log(imp+1)* 0.5
+                + gr          * 0.3
+                - pos         * 0.2)
+    return df.apply(calc_rp, axis=1)
+
+@pytest.fixture(scope="module")
+def sample():
+    return read_sheet_csv(SAMPLE_CSV)
+
+def tied_frame(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    """
+    同点のスコアが多く出る（各特徴量が少数の値しか取らない）データ。sales=0 と欠損の行も含む。
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "POST_ID": [str(i) for i in range(n)],
+        "sales": rng.choice([0.0, 9.0, 99.0, np.nan], n),
+        "cv": rng.choice([0.0, 1.0, np.nan], n),
+        "page_view": rng.choice([0.0, 9.0], n),
+        "imp": rng.choice([0.0, 99.0], n),
+        "growth_rate": rng.choice([0.0, 10.0, np.nan], n),
+        "avg_position": rng.choice([1.0, 5.0, np.nan], n),
+    })
+
+def test_growth_rate_matches_row_wise(sample):
+    expected = old_growth_rate(sample)
+    assert calc_growth_rate(sample).tolist() == expected.tolist()
+    edge = pd.DataFrame({"30日間平均順位": [0.0, -1.0, np.nan, 3.0, 7.5], "7日間平均順位": [2.0, 1.0, 4.0, np.nan, 7.5]})
+    assert calc_growth_rate(edge).tolist() == old_growth_rate(edge).tolist()
+
+def test_rewrite_priority_matches_row_wise(sample):
+    df = sample.assign(growth_rate=calc_growth_rate(sample))
+    targets = rank_rewrite_priority(df).drop(columns=["rewrite_priority"])
+    assert calc_rewrite_priority(targets).tolist() == old_rewrite_priority(targets).tolist()
+    # 列が無い場合の既定値（avg_position だけは 9999）
+    missing = pd.DataFrame({"sales": [5.0, 1.0]})
+    assert calc_rewrite_priority(missing).tolist() == old_rewrite_priority(missing).tolist()
+
+def test_rank_matches_row_wise_order(sample):
+    df = sample.assign(growth_rate=calc_growth_rate(sample))
+    ranked = rank_rewrite_priority(df)
+    expected = rank_rewrite_priority(df).drop(columns=["rewrite_priority"])
+    expected = expected.assign(rewrite_priority=old_rewrite_priority(expected))
+    expected = expected.sort_values("rewrite_priority", ascending=False, kind="mergesort")
+    assert ranked.index.tolist() == expected.index.tolist()
+
+@pytest.mark.parametrize("use_mask", [False, True])
+def test_top_k_matches_full_sort(use_mask):
+    df = tied_frame()
+    row_mask = np.random.default_rng(1).random(len(df)) < 0.6 if use_mask else None
+    features = ranking_features(df)
+    weights = {"growth_rate": 0.5, "avg_position": 0.1}
+    full = rank_rewrite_priority(df[row_mask] if use_mask else df, weights)
+    n = len(full)
+    assert full["rewrite_priority"].duplicated().any()
+    for k in [1, 2, n - 1, n, n + 10]:
+        top = top_k_rewrite_priority(df, features, weights, k, row_mask=row_mask)
+        pd.testing.assert_frame_equal(top, full.head(k))
+
+def test_top_k_indices_ties_and_nan():
+    scores = np.array([1.0, np.nan, 3.0, 3.0, 1.0, np.nan, 2.0, 3.0, 1.0])
+    expected = pd.Series(scores).sort_values(ascending=False, kind="mergesort", na_position="last").index.to_numpy()
+    n = len(scores)
+    for k in range(0, n + 3):
+        assert top_k_indices(scores, k).tolist() == expected[:k].tolist()
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import read_sheet_csv
+from search_index import build_search_index, normalize, text_mask
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sheet_query_data.csv")
+
+FIELDS = ["post_title", "SEO対策KW"]
+
+def naive_mask(df: pd.DataFrame, query: str, fields: list = FIELDS) -> np.ndarray:
+    """
+    索引を使わない、正規化した文字列への素朴な部分一致（語は AND、列は OR）。
+    """
+    texts = [[normalize(v) if isinstance(v, str) else "" for v in df[f]] for f in fields]
+    return np.array([
+        all(any(term in t[i] for t in texts) for term in normalize(query).split())
+        for i in range(len(df))
+    ], dtype=bool)
+
+@pytest.fixture(scope="module")
+def small():
+    """
+    全角/半角・大文字/小文字の揺れ、欠損・空文字、同じ文字列の行を含むデータ。
+    """
+    df = pd.DataFrame({
+        "post_title": ["ＡＢＣアプリ", "abcゲーム", "カメラ　アプリ", None, "", "ｶﾒﾗ 比較", "ＡｐＰ ストア", "アアア", "abcゲーム"],
+        "SEO対策KW": ["アプリ おすすめ", np.nan, "カメラ", "ゲーム 無料", "abc", "", "App", "アア", "xyz"],
+    })
+    return df, build_search_index(df, range_fields=[])
+
+@pytest.mark.parametrize("query", [
+    "a", "ａ", "A", "ア", "ｱ",               # 1文字（全角/半角・大文字/小文字）
+    "ab", "ＡＢ", "アプ", "カメ", "ｶﾒ",       # 2文字
+    "abc", "ABCア", "アプリ", "アアア", "カメラ", "app ストア",  # 3文字以上・複数語
+    "ん", "アん", "んんん", "zz", "ゲーム 無", "ab アプ",  # 索引に無い文字・無い並び・AND
+    "", "   ",
+])
+def test_text_mask_matches_naive_scan(small, query):
+    df, index = small
+    assert text_mask(index, query).tolist() == naive_mask(df, query).tolist()
+
+def test_text_mask_single_field(small):
+    df, index = small
+    assert text_mask(index, "abc", ["SEO対策KW"]).tolist() == naive_mask(df, "abc", ["SEO対策KW"]).tolist()
+
+def test_text_mask_matches_naive_scan_on_sample():
+    df = read_sheet_csv(SAMPLE_CSV)
+    index = build_search_index(df)
+    rng = np.random.default_rng(0)
+    titles = [t for t in df["post_title"] if len(t) >= 6]
+    queries = []
+    for t in rng.choice(titles, 30):
+        start = int(rng.integers(0, len(t) - 5))
+        queries.append(t[start:start + int(rng.integers(1, 6))])
+    for q in queries:
+        assert text_mask(index, q).tolist() == naive_mask(df, q).tolist(), q
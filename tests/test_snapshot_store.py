@@ -0,0 +1,25 @@
+import os
+from datetime import date
+
+import pytest
+
+from data_loader import read_sheet_csv
+from scoring import calc_rewrite_priority
+from snapshot_store import load_snapshots, write_snapshot
+from transform import prepare_view
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sheet_query_data.csv")
+
+def test_snapshot_scores_match_the_table(tmp_path):
+    """
+    スナップショットの growth_rate / rewrite_priority が Data Viewer の表（prepare_view 後に計算）と同じ値になること。
+    """
+    raw = read_sheet_csv(SAMPLE_CSV)
+    write_snapshot(raw, date(2026, 1, 1), root=str(tmp_path))
+    snap = load_snapshots(root=str(tmp_path))
+    view = prepare_view(raw)
+    assert snap["POST_ID"].tolist() == raw["POST_ID"].tolist()
+    assert snap["growth_rate"].tolist() == view["growth_rate"].tolist()
+    assert snap["rewrite_priority"].tolist() == pytest.approx(calc_rewrite_priority(view).tolist())
+    # 指標そのものは丸める前の値のまま保存する
+    assert snap["avg_position"].tolist() == pytest.approx(raw["avg_position"].tolist(), nan_ok=True)
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from compact import compact_frame
+from data_loader import read_sheet_csv
+from table_view import page_slice, sort_frame, to_html_table
+from transform import prepare_view
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sheet_query_data.csv")
+
+@pytest.fixture(scope="module")
+def view():
+    return prepare_view(read_sheet_csv(SAMPLE_CSV))
+
+@pytest.mark.parametrize("sort_col", [None, "7日間平均順位", "session", "比較（7日間が良ければ＋）"])
+@pytest.mark.parametrize("page", [1, 2, 3])
+def test_compact_frame_renders_same_cells(view, sort_col, page):
+    """
+    compact_frame（float32 化・categorical 化）の前後で、表示されるセルの文字列が変わらないこと
+    （float32 を Python の float に広げると 4.3 が 4.300000190734863 になる）。
+    """
+    compact = compact_frame(view)
+    before = to_html_table(page_slice(sort_frame(view, sort_col), page, 50))
+    after = to_html_table(page_slice(sort_frame(compact, sort_col), page, 50))
+    assert after == before
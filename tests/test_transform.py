@@ -0,0 +1,15 @@
+import pandas as pd
+
+from data_loader import read_sheet_csv
+from test_data_loader import write_csv_with_new_column
+from transform import prepare_view, read_view, write_view
+
+def test_write_view_with_unknown_column_in_chunks(tmp_path):
+    """
+    SCHEMA に無い列の値が途中のチャンクから文字列になっても、表示用 Parquet を最後まで書き出せること。
+    """
+    path = write_csv_with_new_column(tmp_path / "new.csv")
+    meta = write_view(path, str(tmp_path / "view.parquet"), chunk_rows=5)
+    view, _ = read_view(str(tmp_path / "view.parquet"))
+    assert meta["rows"] == 20
+    pd.testing.assert_frame_equal(view, prepare_view(read_sheet_csv(path)))